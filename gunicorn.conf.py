@@ -0,0 +1,31 @@
+"""
+Gunicorn settings of the production profile, tuned through environment
+variables. Measure with scripts/loadtest.py before changing the counts.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Processes serving requests in parallel, by default two per CPU plus one
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+
+# Threads per worker, more than one switches to the threaded worker so
+# requests waiting on the database don't block the whole process
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+worker_class = os.getenv(
+    "GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync"
+)
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
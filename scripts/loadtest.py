@@ -0,0 +1,104 @@
+"""
+Closed-loop load test of a running API server, used to choose the
+GUNICORN_WORKERS and GUNICORN_THREADS counts of the production profile.
+
+Each of the --concurrency clients sends its next request as soon as the
+previous one is answered, for --duration seconds, cycling through the
+given paths:
+
+    python scripts/loadtest.py http://localhost \\
+        /api/theatre/performances/ /api/theatre/plays/ \\
+        --token <access token> --concurrency 32 --duration 30
+
+Requires nothing beyond the standard library.
+"""
+import argparse
+import itertools
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("base_url", help="e.g. http://localhost")
+    parser.add_argument("paths", nargs="+", help="paths requested in turn")
+    parser.add_argument("--token", help="JWT access token of a user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    return parser.parse_args()
+
+
+def client(args, deadline, latencies, statuses, lock):
+    headers = {"Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    for path in itertools.cycle(args.paths):
+        if time.monotonic() >= deadline:
+            return
+
+        request = urllib.request.Request(args.base_url + path, headers=headers)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=args.timeout) as res:
+                res.read()
+                status = res.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        except OSError:
+            status = "error"
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] += 1
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def main():
+    args = parse_args()
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    threads = [
+        threading.Thread(
+            target=client, args=(args, deadline, latencies, statuses, lock)
+        )
+        for _ in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    if not latencies:
+        print("No requests completed")
+        return
+
+    latencies.sort()
+    print(f"requests     {len(latencies)} in {elapsed:.1f}s")
+    print(f"throughput   {len(latencies) / elapsed:.1f} req/s")
+    for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        latency = percentile(latencies, fraction) * 1000
+        print(f"{label:<12} {latency:.1f} ms")
+    print(f"mean         {statistics.mean(latencies) * 1000:.1f} ms")
+    print("statuses     " + ", ".join(
+        f"{status}: {count}" for status, count in sorted(
+            statuses.items(), key=lambda item: str(item[0])
+        )
+    ))
+
+
+if __name__ == "__main__":
+    main()
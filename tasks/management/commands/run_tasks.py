@@ -0,0 +1,104 @@
+import logging
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import DatabaseError, connection
+
+from tasks.queue import run_next
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Django command to run queued tasks, each of the concurrent workers
+    claiming the next due task with SELECT ... FOR UPDATE SKIP LOCKED.
+    SIGTERM and SIGINT let the workers finish their current task first.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Workers running tasks side by side, each in a thread "
+            "with its own database connection",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds an idle worker waits before looking again",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Stop once no task is due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = (
+            options["concurrency"] or settings.TASKS_WORKER_CONCURRENCY
+        )
+        poll_interval = (
+            options["poll_interval"] or settings.TASKS_POLL_INTERVAL
+        )
+        self.stopping = threading.Event()
+        self.ran = 0
+        self.ran_lock = threading.Lock()
+
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            if concurrency == 1:
+                self.work(poll_interval, options["burst"])
+            else:
+                workers = [
+                    threading.Thread(
+                        target=self.work_in_thread,
+                        args=(poll_interval, options["burst"]),
+                        name=f"tasks-worker-{number}",
+                    )
+                    for number in range(concurrency)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {self.ran} task(s)"))
+
+    def stop(self, signum, frame):
+        self.stdout.write("Stopping after the current tasks...")
+        self.stopping.set()
+
+    def work(self, poll_interval, burst):
+        while not self.stopping.is_set():
+            try:
+                ran = run_next()
+            except DatabaseError:
+                logger.exception("Claiming a task failed")
+                # reconnect on the next attempt
+                connection.close()
+                ran = False
+
+            if ran:
+                with self.ran_lock:
+                    self.ran += 1
+            elif burst:
+                return
+            else:
+                self.stopping.wait(poll_interval)
+
+    def work_in_thread(self, poll_interval, burst):
+        try:
+            self.work(poll_interval, burst)
+        finally:
+            connection.close()
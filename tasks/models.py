@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A queued run of a function registered with @task. Workers delete it
+    once it succeeds and keep it as failed once out of attempts.
+
+    run_at is when it is due next. While a worker runs it, that is when
+    the lease of the worker ends.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        indexes = [
+            # workers only look for queued tasks that are due
+            models.Index(
+                fields=["run_at", "id"],
+                condition=Q(status="queued"),
+                name="task_queued_run_at_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,145 @@
+import functools
+import logging
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class TaskFunction:
+    """
+    A function workers run once it has been enqueued. Calling it still
+    runs it right away.
+    """
+
+    def __init__(self, func, max_attempts=None):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """
+        Queues a run with arguments that serialize to JSON. The task is
+        saved in the current transaction, so workers only pick it up
+        once that commits and never if it rolls back.
+        """
+        return Task.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            max_attempts=self.max_attempts or settings.TASKS_MAX_ATTEMPTS,
+        )
+
+
+def task(func=None, *, max_attempts=None):
+    """
+    Registers a module level function to be run by workers, as
+    `func.enqueue(*args, **kwargs)` from views or signal receivers
+    """
+    if func is None:
+        return functools.partial(task, max_attempts=max_attempts)
+
+    task_function = TaskFunction(func, max_attempts)
+    _registry[task_function.name] = task_function
+    return task_function
+
+
+def get_task(name):
+    if name not in _registry:
+        # registered when the module defining it is imported
+        module, _, _ = name.rpartition(".")
+        import_module(module)
+    return _registry[name]
+
+
+def retry_delay(attempts):
+    """Doubles the wait after every failed attempt, up to a maximum"""
+    seconds = settings.TASKS_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.TASKS_RETRY_BACKOFF_MAX))
+
+
+def claim_next():
+    """
+    Claims the earliest due task that no other worker holds, counting
+    the attempt, or returns None when there is none.
+
+    The claim commits before the task runs, and leases it for
+    TASKS_LEASE seconds by pushing run_at out. If the worker dies, e.g.
+    killed for running out of memory, the task becomes due again once
+    the lease runs out, with the attempt already counted.
+    """
+    while True:
+        with transaction.atomic():
+            task = (
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=Task.Status.QUEUED, run_at__lte=timezone.now()
+                )
+                .order_by("run_at", "id")
+                .first()
+            )
+            if task is None:
+                return None
+
+            if task.attempts >= task.max_attempts:
+                # the worker running the last attempt died
+                task.status = Task.Status.FAILED
+                task.last_error = (
+                    f"The worker stopped during attempt {task.attempts}."
+                )
+                task.save(update_fields=["status", "last_error"])
+                continue
+
+            task.attempts += 1
+            task.run_at = timezone.now() + timedelta(
+                seconds=settings.TASKS_LEASE
+            )
+            task.save(update_fields=["attempts", "run_at"])
+            return task
+
+
+def run_task(task):
+    """
+    Runs a claimed task in a transaction, so a failed attempt leaves no
+    writes behind, and reschedules it while it has attempts left
+    """
+    try:
+        with transaction.atomic():
+            get_task(task.name)(*task.args, **task.kwargs)
+    except Exception:
+        logger.exception(
+            "Task %s (%s) failed on attempt %s of %s",
+            task.id, task.name, task.attempts, task.max_attempts,
+        )
+        task.last_error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            task.status = Task.Status.FAILED
+        else:
+            task.run_at = timezone.now() + retry_delay(task.attempts)
+        task.save(update_fields=["last_error", "status", "run_at"])
+        return False
+
+    task.delete()
+    return True
+
+
+def run_next():
+    """Runs the next due task, returns False when there is none"""
+    task = claim_next()
+    if task is None:
+        return False
+    run_task(task)
+    return True
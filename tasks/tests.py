@@ -0,0 +1,138 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim_next, retry_delay, run_next, task
+
+RAN = []
+RAN_LOCK = threading.Lock()
+
+
+@task
+def record(value, suffix=""):
+    with RAN_LOCK:
+        RAN.append(f"{value}{suffix}")
+
+
+@task(max_attempts=2)
+def fail():
+    Task.objects.create(name="written by fail", max_attempts=1)
+    raise ValueError("boom")
+
+
+def run_tasks(*args):
+    call_command("run_tasks", "--burst", *args, stdout=StringIO())
+
+
+@override_settings(TASKS_RETRY_BACKOFF=10, TASKS_RETRY_BACKOFF_MAX=60)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        RAN.clear()
+
+    def test_enqueue_saves_task(self):
+        queued = record.enqueue(1, suffix="st")
+
+        self.assertEqual(queued.name, "tasks.tests.record")
+        self.assertEqual(queued.args, [1])
+        self.assertEqual(queued.kwargs, {"suffix": "st"})
+        self.assertEqual(queued.status, Task.Status.QUEUED)
+        self.assertEqual(RAN, [])
+
+    def test_calling_task_runs_it_right_away(self):
+        record("now")
+
+        self.assertEqual(RAN, ["now"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_worker_runs_due_tasks_in_order(self):
+        record.enqueue("first")
+        record.enqueue("second")
+        later = record.enqueue("later")
+        Task.objects.filter(id=later.id).update(
+            run_at=timezone.now() + timedelta(hours=1)
+        )
+
+        run_tasks("--concurrency", "1")
+
+        self.assertEqual(RAN, ["first", "second"])
+        self.assertEqual(list(Task.objects.all()), [later])
+
+    def test_failed_attempt_is_retried_later(self):
+        queued = fail.enqueue()
+
+        with self.assertLogs("tasks.queue", "ERROR"):
+            self.assertTrue(run_next())
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn("ValueError: boom", queued.last_error)
+        self.assertGreater(queued.run_at, timezone.now())
+        # writes of the failed attempt are rolled back
+        self.assertFalse(Task.objects.filter(name="written by fail").exists())
+        self.assertFalse(run_next())
+
+    def test_task_fails_once_out_of_attempts(self):
+        queued = fail.enqueue()
+        with self.assertLogs("tasks.queue", "ERROR"):
+            run_next()
+        Task.objects.filter(id=queued.id).update(run_at=timezone.now())
+
+        with self.assertLogs("tasks.queue", "ERROR"):
+            run_next()
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.FAILED)
+        self.assertEqual(queued.attempts, 2)
+        self.assertFalse(run_next())
+
+    def test_task_of_stopped_worker_is_retried_after_lease(self):
+        queued = fail.enqueue()
+        # the worker dies while running the claimed task
+        claim_next()
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertFalse(run_next())
+
+        Task.objects.filter(id=queued.id).update(run_at=timezone.now())
+        claim_next()
+        Task.objects.filter(id=queued.id).update(run_at=timezone.now())
+
+        self.assertFalse(run_next())
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.FAILED)
+        self.assertEqual(queued.attempts, 2)
+        self.assertIn("worker stopped", queued.last_error)
+
+    def test_retry_delay_doubles_up_to_maximum(self):
+        self.assertEqual(
+            [retry_delay(attempts).seconds for attempts in range(1, 6)],
+            [10, 20, 40, 60, 60],
+        )
+
+
+class ConcurrentWorkersTests(TransactionTestCase):
+    def setUp(self):
+        RAN.clear()
+
+    @skipUnlessDBFeature("has_select_for_update_skip_locked")
+    def test_every_task_runs_once(self):
+        for value in range(20):
+            record.enqueue(value)
+
+        run_tasks("--concurrency", "4")
+
+        self.assertEqual(sorted(RAN), sorted(str(i) for i in range(20)))
+        self.assertFalse(Task.objects.exists())
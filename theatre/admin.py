@@ -7,7 +7,8 @@ from theatre.models import (
     Play,
     TheatreHall,
     Ticket,
-    Reservation
+    Reservation,
+    ReservationConfirmation,
 )
 
 admin.site.register(TheatreHall)
@@ -17,3 +18,4 @@ admin.site.register(Play)
 admin.site.register(Performance)
 admin.site.register(Reservation)
 admin.site.register(Ticket)
+admin.site.register(ReservationConfirmation)
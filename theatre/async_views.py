@@ -0,0 +1,131 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    Serves the list and retrieve actions of a viewset as coroutines,
+    fetching rows with the async ORM, so that under ASGI requests
+    waiting on the database don't hold a worker thread. Every other
+    action keeps running the synchronous DRF view in a thread.
+
+    Only with ASYNC_VIEWS on, which the ASGI app turns on by default.
+    Under WSGI a coroutine view would only add the hops between the
+    request thread and an event loop, so the synchronous view is served.
+
+    Mixins extending list or retrieve provide `alist` and `aretrieve`
+    counterparts and come before this one in the bases.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if "get" in actions and "head" not in actions:
+            actions = {**actions, "head": actions["get"]}
+
+        sync_view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS or not any(
+            action in cls.async_actions for action in actions.values()
+        ):
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_to_async(sync_view)(
+                    request, *args, **kwargs
+                )
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.__name__ = sync_view.__name__
+        view.__doc__ = sync_view.__doc__
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.sync_view = sync_view
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """`dispatch` awaiting the handler of the action"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # authentication and throttling may query the database
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        # DRF paginators evaluate the page themselves
+        return await sync_to_async(self.paginate_queryset)(queryset)
+
+    async def afilter_queryset(self):
+        """
+        The filtered queryset of `get_queryset`, which viewsets running
+        queries to build it override to do so in a thread
+        """
+        return self.filter_queryset(self.get_queryset())
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    @staticmethod
+    async def aserialize(serializer):
+        # nested serializers may still follow relations lazily
+        return await sync_to_async(lambda: serializer.data)()
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset()
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(
+                await self.aserialize(serializer)
+            )
+
+        serializer = self.get_serializer(
+            [obj async for obj in queryset], many=True
+        )
+        return Response(await self.aserialize(serializer))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(await self.aserialize(serializer))
@@ -0,0 +1,205 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from theatre import metrics
+
+
+def catalog_cache():
+    return caches[settings.CATALOG_CACHE]
+
+
+def version_key(model, scope=None):
+    key = f"catalog:version:{model._meta.label_lower}"
+    return key if scope is None else f"{key}:{scope}"
+
+
+def bump_version(model, *scopes):
+    """
+    Invalidates responses built from rows of the model, including those
+    built only from the given scopes of it (e.g. tickets of a performance).
+
+    The versions change again once the current transaction commits, as
+    a request in between still sees the old rows and would keep its
+    response under the new version.
+    """
+    def bump():
+        version = time.time_ns()
+        catalog_cache().set_many(
+            {
+                version_key(model, scope): version
+                for scope in (None, *scopes)
+            },
+            None,
+        )
+
+    bump()
+    if connection.in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def get_versions(keys):
+    """Returns current version stamps of the keys in the same order"""
+    cache = catalog_cache()
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+class VersionStampMixin:
+    """Resolves version stamps of the rows a response is built from"""
+
+    cache_models = ()
+
+    def get_version_keys(self):
+        return [version_key(model) for model in self.cache_models]
+
+    def get_versions(self):
+        if not hasattr(self, "_versions"):
+            self._versions = get_versions(self.get_version_keys())
+        return self._versions
+
+
+class ConditionalGetMixin(VersionStampMixin):
+    """
+    Sets ETag and Last-Modified of list and retrieve responses from
+    the version stamps and answers matching conditional requests with
+    304 before the queryset is touched
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def get_etag(self, request):
+        digest = hashlib.md5(
+            f"{self.get_versions()}:{request.accepted_renderer.format}:"
+            f"{request.build_absolute_uri()}".encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def get_validators(self, request):
+        """Returns the ETag and Last-Modified timestamp of the response"""
+        return self.get_etag(request), max(self.get_versions()) // 10 ** 9
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    async def aconditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(self.get_validators)(
+            request
+        )
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+
+class CatalogCacheMixin(VersionStampMixin):
+    """
+    Caches list and retrieve responses by absolute URL until any row
+    of `cache_models` is saved or deleted
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def get_cache_key(self, request):
+        digest = hashlib.md5(
+            f"{self.get_versions()}:{request.build_absolute_uri()}".encode()
+        ).hexdigest()
+        return f"catalog:response:{self.basename}:{self.action}:{digest}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = catalog_cache()
+        key = self.get_cache_key(request)
+
+        data = cache.get(key)
+        if data is not None:
+            metrics.increment("catalog_cache.hits")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        metrics.increment("catalog_cache.misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        cache = catalog_cache()
+        key = await sync_to_async(self.get_cache_key)(request)
+
+        data = await cache.aget(key)
+        if data is not None:
+            metrics.increment("catalog_cache.hits")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        metrics.increment("catalog_cache.misses")
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(
+                key, response.data, settings.CATALOG_CACHE_TIMEOUT
+            )
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,125 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.utils import DNS_NAME
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.queue import retry_delay
+from theatre.models import ReservationConfirmation
+
+logger = logging.getLogger(__name__)
+
+
+def message_id(reservation_id):
+    """
+    The same for every delivery of a confirmation, so mail clients can
+    tell the one message a dispatcher crash may send twice is a copy
+    """
+    return f"<reservation-{reservation_id}.confirmation@{DNS_NAME}>"
+
+
+def confirmation_message(confirmation):
+    reservation = confirmation.reservation
+    tickets = "\n".join(
+        f"{ticket.performance.play.title}, "
+        f"{timezone.localtime(ticket.performance.show_time):%Y-%m-%d %H:%M}"
+        f", row {ticket.row}, seat {ticket.seat}"
+        for ticket in reservation.tickets.all()
+    )
+    return EmailMessage(
+        subject=f"Reservation #{reservation.id} confirmed",
+        body=f"Your tickets:\n\n{tickets}\n",
+        to=[reservation.user.email],
+        headers={"Message-ID": message_id(reservation.id)},
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Claims a batch of due confirmations that no other dispatcher holds,
+    counting the attempt.
+
+    The claim commits before anything is sent, and leases the batch for
+    CONFIRMATION_LEASE seconds by pushing next_attempt_at out. If the
+    dispatcher stops, what it hadn't marked sent becomes due again once
+    the lease runs out.
+    """
+    with transaction.atomic():
+        batch = list(
+            ReservationConfirmation.objects.select_for_update(
+                skip_locked=True, of=("self", )
+            )
+            .filter(
+                sent_at=None,
+                attempts__lt=settings.CONFIRMATION_MAX_ATTEMPTS,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .select_related("reservation__user")
+            .prefetch_related("reservation__tickets__performance__play")
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        leased_until = timezone.now() + timedelta(
+            seconds=settings.CONFIRMATION_LEASE
+        )
+        for confirmation in batch:
+            confirmation.attempts += 1
+            confirmation.next_attempt_at = leased_until
+        ReservationConfirmation.objects.bulk_update(
+            batch, ["attempts", "next_attempt_at"]
+        )
+    return batch
+
+
+def record_failure(confirmation):
+    """
+    Puts the next attempt off like a failed task. One failing too often
+    is left for the admin to look into.
+    """
+    confirmation.last_error = traceback.format_exc()
+    confirmation.next_attempt_at = timezone.now() + retry_delay(
+        confirmation.attempts
+    )
+    confirmation.save(update_fields=["last_error", "next_attempt_at"])
+
+
+def send_confirmations(batch_size):
+    """
+    Sends a batch of due confirmations over one connection of the email
+    backend, returns how many were sent and how many failed.
+
+    Each confirmation is marked sent right after its message went out,
+    so a dispatcher stopping mid-batch sends at most that one again.
+    """
+    pending = claim_batch(batch_size)
+    if not pending:
+        return 0, 0
+
+    sent = failed = 0
+    try:
+        with get_connection() as mail:
+            while pending:
+                confirmation = pending.pop(0)
+                try:
+                    mail.send_messages([confirmation_message(confirmation)])
+                except Exception:
+                    logger.exception(
+                        "Sending confirmation of reservation %s failed",
+                        confirmation.reservation_id,
+                    )
+                    record_failure(confirmation)
+                    failed += 1
+                else:
+                    confirmation.sent_at = timezone.now()
+                    confirmation.save(update_fields=["sent_at"])
+                    sent += 1
+    except Exception:
+        # the backend couldn't connect, the rest waits for it
+        logger.exception("Connecting to the email backend failed")
+        for confirmation in pending:
+            record_failure(confirmation)
+            failed += 1
+    return sent, failed
@@ -0,0 +1,107 @@
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+ISO_WEEK_RE = re.compile(r"^(\d{4})-W(\d{2})$")
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+
+
+def _parse_date(param, value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError(
+            {param: "Date has wrong format. Use YYYY-MM-DD."}
+        )
+
+
+def _parse_week(param, value):
+    match = ISO_WEEK_RE.match(value)
+    try:
+        return date.fromisocalendar(int(match[1]), int(match[2]), 1)
+    except (TypeError, ValueError):
+        raise ValidationError(
+            {param: "Week has wrong format. Use YYYY-Www."}
+        )
+
+
+def _day_start(day):
+    """Returns the aware midnight starting the day in TIME_ZONE"""
+    return timezone.make_aware(
+        datetime.combine(day, time.min), timezone.get_default_timezone()
+    )
+
+
+def show_time_filters(query_params):
+    """
+    Turns ?date=, ?from=, ?to= (inclusive) and ?week= (ISO week)
+    into a half-open `show_time >= start AND show_time < end` range of
+    local days, so that an index on show_time can serve it
+    """
+    date_str = query_params.get("date")
+    from_str = query_params.get("from")
+    to_str = query_params.get("to")
+    week_str = query_params.get("week")
+
+    starts, ends = [], []
+
+    if date_str is not None:
+        day = _parse_date("date", date_str)
+        starts.append(day)
+        ends.append(day + timedelta(days=1))
+
+    if from_str is not None:
+        starts.append(_parse_date("from", from_str))
+
+    if to_str is not None:
+        ends.append(_parse_date("to", to_str) + timedelta(days=1))
+
+    if week_str is not None:
+        monday = _parse_week("week", week_str)
+        starts.append(monday)
+        ends.append(monday + timedelta(weeks=1))
+
+    filters = {}
+    if starts:
+        filters["show_time__gte"] = _day_start(max(starts))
+    if ends:
+        filters["show_time__lt"] = _day_start(min(ends))
+    return filters
+
+
+def parse_match(param, value):
+    """Validates ?<relation>_match=, which defaults to any"""
+    if value is None:
+        return MATCH_ANY
+
+    if value not in (MATCH_ANY, MATCH_ALL):
+        raise ValidationError(
+            {param: f"Use either {MATCH_ANY} or {MATCH_ALL}."}
+        )
+    return value
+
+
+def related_filter(model, field_name, ids, match=MATCH_ANY):
+    """
+    Semi-join of the model with rows of its many-to-many field, either
+    linked to any of the ids or to all of them. Unlike filtering across
+    the join it never duplicates rows, so no DISTINCT is needed
+    """
+    field = model._meta.get_field(field_name)
+    links = field.remote_field.through.objects.filter(
+        **{field.m2m_column_name(): OuterRef("pk")}
+    )
+    target = field.m2m_reverse_name()
+
+    if match == MATCH_ALL:
+        return Q(*[
+            Exists(links.filter(**{target: pk}))
+            for pk in sorted(set(ids))
+        ])
+
+    return Q(Exists(links.filter(**{f"{target}__in": ids})))
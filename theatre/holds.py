@@ -0,0 +1,91 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+
+@dataclass
+class SeatHold:
+    token: str
+    performance_id: int
+    user_id: int
+    seats: list[tuple[int, int]]
+    expires_at: datetime
+
+
+def hold_cache():
+    return caches[settings.HOLD_CACHE]
+
+
+def _seat_key(performance_id, row, seat):
+    return f"seat-hold:{performance_id}:{row}:{seat}"
+
+
+def _hold_key(token):
+    return f"seat-hold:{token}"
+
+
+def create_hold(performance_id, user_id, seats):
+    """
+    Claims every seat for the user for SEAT_HOLD_MINUTES.
+    Returns None without claiming anything when some seat is already held.
+    Expired holds are dropped by the cache itself.
+    """
+    timeout = settings.SEAT_HOLD_MINUTES * 60
+    hold = SeatHold(
+        token=uuid.uuid4().hex,
+        performance_id=performance_id,
+        user_id=user_id,
+        seats=seats,
+        expires_at=timezone.now() + timedelta(seconds=timeout),
+    )
+
+    cache = hold_cache()
+    claimed_keys = []
+    for row, seat in seats:
+        key = _seat_key(performance_id, row, seat)
+        if not cache.add(key, (user_id, hold.token), timeout):
+            cache.delete_many(claimed_keys)
+            return None
+        claimed_keys.append(key)
+
+    cache.set(_hold_key(hold.token), hold, timeout)
+    return hold
+
+
+def get_hold(token):
+    hold = hold_cache().get(_hold_key(token))
+    if hold is None or hold.expires_at <= timezone.now():
+        return None
+    return hold
+
+
+def release_hold(hold):
+    """Frees the seats which are still claimed by the hold"""
+    seat_keys = [
+        _seat_key(hold.performance_id, row, seat) for row, seat in hold.seats
+    ]
+    cache = hold_cache()
+    cache.delete_many([
+        key
+        for key, (_, token) in cache.get_many(seat_keys).items()
+        if token == hold.token
+    ])
+    cache.delete(_hold_key(hold.token))
+
+
+def seats_held_by_others(performance_id, seats, user_id):
+    """Returns the seats of the performance held by other users"""
+    seat_keys = {
+        _seat_key(performance_id, row, seat): (row, seat)
+        for row, seat in seats
+    }
+    held = hold_cache().get_many(seat_keys)
+    return [
+        seat_keys[key]
+        for key, (holder_id, _) in held.items()
+        if holder_id != user_id
+    ]
@@ -0,0 +1,109 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from tasks.queue import task
+from theatre import metrics
+from theatre.cache import bump_version
+from theatre.models import Play
+from theatre.storage import unhashed_name
+
+# name: bounding box (width, height) the variant is scaled down into
+VARIANTS = {
+    "thumbnail": (240, 360),
+    "detail": (640, 960),
+    "retina": (1280, 1920),
+}
+VARIANT_FORMAT = "JPEG"
+VARIANT_EXTENSION = ".jpg"
+VARIANT_QUALITY = 80
+
+
+def variant_path(name, variant):
+    """Stores the variant next to the original, e.g. `<name>.thumbnail.jpg`"""
+    root, _ = os.path.splitext(unhashed_name(name))
+    return f"{root}.{variant}{VARIANT_EXTENSION}"
+
+
+def render_variant(image, box):
+    variant = image.copy()
+    variant.thumbnail(box, Image.LANCZOS)
+    if variant.mode != "RGB":
+        # JPEG has no alpha channel, flatten it onto white
+        background = Image.new("RGB", variant.size, "white")
+        variant = variant.convert("RGBA")
+        background.paste(variant, mask=variant.getchannel("A"))
+        variant = background
+
+    output = BytesIO()
+    variant.save(
+        output,
+        VARIANT_FORMAT,
+        quality=VARIANT_QUALITY,
+        optimize=True,
+        progressive=True,
+    )
+    return ContentFile(output.getvalue())
+
+
+@task(max_attempts=3)
+def generate_variants(play_id, name):
+    """
+    Builds every variant of the image of the play and records their
+    paths, unless the image has been replaced in the meantime
+    """
+    plays = Play.objects.filter(id=play_id, image=name)
+    previous = plays.values_list("image_variants", flat=True).first()
+    if previous is None:
+        return
+
+    storage = Play._meta.get_field("image").storage
+    with storage.open(name) as file, Image.open(file) as image:
+        if image.width * image.height > settings.PLAY_IMAGE_MAX_PIXELS:
+            raise ValueError(f"{name} has too many pixels to decode")
+        # JPEGs are decoded right at the scale of the largest variant
+        largest = max(max(box) for box in VARIANTS.values())
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        variants = {
+            variant: storage.save(
+                variant_path(name, variant), render_variant(image, box)
+            )
+            for variant, box in VARIANTS.items()
+        }
+
+    if not plays.update(image_variants=variants):
+        delete_variants(variants)
+        return
+    # left over by an earlier build of the same image
+    delete_variants({
+        variant: path
+        for variant, path in previous.items()
+        if path not in variants.values()
+    })
+
+    # unlike Play.save(), update() doesn't bump the catalog version
+    bump_version(Play)
+    metrics.increment("images.variants_generated")
+
+
+@task
+def delete_variants(variants):
+    storage = Play._meta.get_field("image").storage
+    for path in variants.values():
+        storage.delete(path)
+
+
+def schedule_variants(play, replaced_variants=None):
+    """
+    Queues building the variants of the image of the play, and deleting
+    those of the image it replaced, for workers to run once the
+    transaction saving it commits
+    """
+    if replaced_variants:
+        delete_variants.enqueue(replaced_variants)
+    if play.image:
+        generate_variants.enqueue(play.id, play.image.name)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import connections
+from django.test import AsyncRequestFactory, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import Performance, Play, TheatreHall
+from theatre.views import PerformanceViewSet, PlayViewSet
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare throughput of the async and synchronous
+    read views of performances and plays at high concurrency, serving
+    requests the way the ASGI handler does. The seeded catalog is
+    committed, since every request runs in its own thread, and deleted
+    afterwards.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2_000)
+        parser.add_argument("--concurrency", type=int, default=64)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"], ASYNC_VIEWS=True)
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            "benchmark-async-views@example.com"
+        )
+        hall = TheatreHall.objects.create(
+            name="Benchmark hall", rows=20, seats_in_row=25
+        )
+        plays = Play.objects.bulk_create(
+            Play(title=f"Benchmark play {i}", description="Benchmark")
+            for i in range(100)
+        )
+        start = timezone.now()
+        Performance.objects.bulk_create(
+            Performance(
+                play=plays[i % len(plays)],
+                theatre_hall=hall,
+                show_time=start + timedelta(hours=i),
+            )
+            for i in range(1_000)
+        )
+
+        try:
+            asyncio.run(self.run(user, plays[0], options))
+        finally:
+            Performance.objects.filter(theatre_hall=hall).delete()
+            hall.delete()
+            Play.objects.filter(id__in=[play.id for play in plays]).delete()
+            user.delete()
+
+    async def run(self, user, play, options):
+        factory = AsyncRequestFactory()
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        endpoints = {
+            "performances list": (PerformanceViewSet, "list", "/", {}),
+            "play detail": (
+                PlayViewSet, "retrieve", "/", {"pk": str(play.id)}
+            ),
+        }
+
+        for name, (viewset, action, path, kwargs) in endpoints.items():
+            view = viewset.as_view({"get": action}, throttle_classes=())
+            for mode, handler in (
+                ("sync", sync_to_async(view.sync_view)),
+                ("async", view),
+            ):
+                seconds = await self.load(
+                    lambda: handler(
+                        factory.get(path, headers=headers), **kwargs
+                    ),
+                    options,
+                )
+                self.stdout.write(
+                    f"{name:<18} {mode:<5} "
+                    f"{options['requests'] / seconds:8.1f} req/s"
+                )
+
+    async def load(self, send_request, options):
+        """Returns seconds to serve all requests, concurrency at a time"""
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def request():
+            # like the ASGI handler, one thread for sync code per request
+            async with semaphore, ThreadSensitiveContext():
+                response = await send_request()
+                await sync_to_async(response.render)()
+                # connections of per-request threads can't be reused
+                await sync_to_async(connections.close_all)()
+                assert response.status_code == 200, response.data
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(request() for _ in range(options["requests"]))
+        )
+        return time.perf_counter() - start
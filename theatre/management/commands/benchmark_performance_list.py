@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from theatre.management.benchmark import best_time, rolled_back
+from theatre.models import Performance, Play, TheatreHall
+from theatre.serializers import PerformanceListRows, PerformanceListSerializer
+from theatre.views import PerformanceViewSet
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare rows/sec of the performance listing
+    rendered by PerformanceListSerializer and by PerformanceListRows,
+    on a seeded schedule that is rolled back afterwards
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--performances", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(options["performances"])
+            self.run(options["performances"], options["repeat"])
+
+    def seed(self, count):
+        self.stdout.write(f"Seeding {count} performances...")
+
+        halls = TheatreHall.objects.bulk_create(
+            TheatreHall(name=f"Benchmark hall {i}", rows=20, seats_in_row=25)
+            for i in range(10)
+        )
+        plays = Play.objects.bulk_create(
+            Play(
+                title=f"Benchmark play {i}",
+                description="Benchmark",
+                image=f"uploads/plays/benchmark-play-{i}.jpg",
+            )
+            for i in range(100)
+        )
+        start = timezone.now()
+        Performance.objects.bulk_create(
+            (
+                Performance(
+                    play=plays[i % len(plays)],
+                    theatre_hall=halls[i % len(halls)],
+                    show_time=start + timedelta(hours=i),
+                )
+                for i in range(count)
+            ),
+            batch_size=5_000,
+        )
+
+    def run(self, count, repeat):
+        context = {"request": RequestFactory().get("/")}
+        queryset = PerformanceViewSet.queryset.order_by("-show_time", "-id")
+
+        cases = {
+            "serializer": lambda: PerformanceListSerializer(
+                queryset.all(), many=True, context=context
+            ).data,
+            "values rows": lambda: PerformanceListRows(
+                queryset.values(*PerformanceListRows.columns),
+                context=context,
+            ).data,
+        }
+
+        for name, func in cases.items():
+            seconds = best_time(func, repeat)
+            self.stdout.write(
+                f"{name:<12} {count / seconds:10.0f} rows/sec "
+                f"(best of {repeat})"
+            )
@@ -0,0 +1,109 @@
+import random
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from theatre.filters import MATCH_ALL, MATCH_ANY, related_filter
+from theatre.management.benchmark import best_time, rolled_back
+from theatre.models import Actor, Genre, Play
+from theatre.views import PlayPagination
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare the genre/actor filters of the plays list
+    joined with DISTINCT against the semi-join filters, on a seeded
+    catalog that is rolled back afterwards
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plays", type=int, default=100_000)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument("--actors", type=int, default=2_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            genre_ids, actor_ids = self.seed(options)
+            self.run(genre_ids, actor_ids, options["repeat"])
+
+    def seed(self, options):
+        self.stdout.write(f"Seeding {options['plays']} plays...")
+        rng = random.Random(0)
+
+        genres = Genre.objects.bulk_create(
+            Genre(name=f"Benchmark genre {i}")
+            for i in range(options["genres"])
+        )
+        actors = Actor.objects.bulk_create(
+            Actor(first_name="Benchmark", last_name=f"Actor {i}")
+            for i in range(options["actors"])
+        )
+        plays = Play.objects.bulk_create(
+            (
+                Play(
+                    title=f"Benchmark play {i:06}",
+                    description=" ".join(
+                        rng.choice(("act", "scene", "stage", "drama"))
+                        for _ in range(100)
+                    ),
+                )
+                for i in range(options["plays"])
+            ),
+            batch_size=5_000,
+        )
+
+        Play.genres.through.objects.bulk_create(
+            (
+                Play.genres.through(play_id=play.id, genre_id=genre.id)
+                for play in plays
+                for genre in rng.sample(genres, 3)
+            ),
+            batch_size=10_000,
+        )
+        Play.actors.through.objects.bulk_create(
+            (
+                Play.actors.through(play_id=play.id, actor_id=actor.id)
+                for play in plays
+                for actor in rng.sample(actors, 8)
+            ),
+            batch_size=10_000,
+        )
+
+        with connection.cursor() as cursor:
+            for model in (Play, Play.genres.through, Play.actors.through):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+        return (
+            [genre.id for genre in genres[:3]],
+            [actor.id for actor in actors[:2]],
+        )
+
+    def run(self, genre_ids, actor_ids, repeat):
+        plays = Play.objects.order_by(*PlayPagination.ordering)
+        cases = {
+            "genres, joined": plays.filter(
+                genres__id__in=genre_ids
+            ).distinct(),
+            "genres, any": plays.filter(
+                related_filter(Play, "genres", genre_ids, MATCH_ANY)
+            ),
+            "genres, all": plays.filter(
+                related_filter(Play, "genres", genre_ids[:2], MATCH_ALL)
+            ),
+            "genres and actors, joined": plays.filter(
+                genres__id__in=genre_ids, actors__id__in=actor_ids
+            ).distinct(),
+            "genres and actors, any": plays.filter(
+                related_filter(Play, "genres", genre_ids, MATCH_ANY),
+                related_filter(Play, "actors", actor_ids, MATCH_ANY),
+            ),
+        }
+
+        for name, queryset in cases.items():
+            page = queryset[:PlayPagination.page_size + 1]
+            seconds = best_time(lambda: list(page.all()), repeat)
+
+            self.stdout.write(
+                f"{name:<28} best {seconds * 1000:8.1f} ms of {repeat}"
+            )
@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand
+
+from theatre.images import generate_variants
+from theatre.models import Play
+
+
+class Command(BaseCommand):
+    """
+    Django command to build variants of play images uploaded before
+    variants existed, or whose background build has been lost
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild variants of every image, not only missing ones",
+        )
+        parser.add_argument(
+            "--defer",
+            action="store_true",
+            help="Queue the builds for task workers instead of running them",
+        )
+
+    def handle(self, *args, **options):
+        plays = Play.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            plays = plays.filter(image_variants={})
+
+        built = 0
+        for play_id, name in plays.values_list("id", "image").iterator():
+            if options["defer"]:
+                generate_variants.enqueue(play_id, name)
+            else:
+                generate_variants(play_id, name)
+            built += 1
+
+        verb = "Queued" if options["defer"] else "Built"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} variants of {built} image(s)")
+        )
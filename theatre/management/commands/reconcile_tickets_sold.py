@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from theatre.models import Performance
+
+
+class Command(BaseCommand):
+    """Django command to fix drift of performances sold tickets counters"""
+
+    def handle(self, *args, **options):
+        reconciled = Performance.reconcile_tickets_sold()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {reconciled} performance(s)")
+        )
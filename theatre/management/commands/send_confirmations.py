@@ -0,0 +1,45 @@
+import time
+
+from django.core.management import BaseCommand
+
+from theatre.confirmations import send_confirmations
+
+
+class Command(BaseCommand):
+    """
+    Django command to send the reservation confirmations waiting in the
+    outbox, batch after batch until none is left
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Confirmations sent over one connection of the backend",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Keep running, looking for new confirmations this often",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_confirmations(options["batch_size"])
+            total_sent += sent
+            total_failed += failed
+            # failed ones are left for the next run to retry
+            if sent == options["batch_size"]:
+                continue
+            if options["poll_interval"] is None:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sent {total_sent} confirmation(s), {total_failed} failed"
+            )
+        )
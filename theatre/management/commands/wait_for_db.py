@@ -1,20 +1,49 @@
 import time
-from django.db import connections
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Django command to pause execution until db is available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=None,
+            help="Give up after this many seconds instead of waiting forever",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
-            try:
-                db_conn = connections["default"].cursor()
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+        connection = connections[options["database"]]
+        started = time.monotonic()
+
+        while not self.is_ready(connection):
+            if (
+                options["timeout"] is not None
+                and time.monotonic() - started >= options["timeout"]
+            ):
+                raise CommandError("Database unavailable, giving up.")
+
+            self.stdout.write("Database unavailable, waiting 1 second...")
+            time.sleep(1)
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
+
+    @staticmethod
+    def is_ready(connection):
+        """
+        Runs a query, as a pooler accepts connections before the
+        database behind it is able to serve them
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        except OperationalError:
+            connection.close()
+            return False
+        return True
@@ -0,0 +1,157 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from theatre.storage import is_hashed
+
+# names carrying a hash of the content never change their bytes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CACHE_CONTROL = "public, max-age=86400"
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """
+    Reads `length` bytes of a file from its current position.
+
+    It has no seek or tell, so FileResponse leaves Content-Length to
+    the caller, while servers sending files with sendfile() still start
+    at the position of fileno() and stop at Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Returns the (start, end) bytes of a single range, None when the
+    header can't be honoured and the whole file is sent instead. Raises
+    ValueError for ranges outside of the file.
+    """
+    match = RANGE.match(header)
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        # the last `end` bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end or size - 1), size - 1)
+
+    if start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get("If-Range")
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/"')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves an uploaded file with headers letting clients and proxies
+    cache it, answering conditional and range requests.
+
+    With MEDIA_OFFLOAD_HEADER set, the front proxy sends the file
+    instead, e.g. nginx on X-Accel-Redirect, so the worker is released
+    right away. Otherwise the file is streamed by the server, which
+    uses sendfile() where it can.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if is_hashed(path) else CACHE_CONTROL
+        ),
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+    }
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if settings.MEDIA_OFFLOAD_HEADER:
+        # the proxy answers range and conditional requests itself
+        response = HttpResponse(content_type=content_type, headers=headers)
+        if settings.MEDIA_OFFLOAD_HEADER.lower() == "x-accel-redirect":
+            location = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        else:
+            location = full_path
+        response[settings.MEDIA_OFFLOAD_HEADER] = location
+        return response
+
+    start, end = 0, stat.st_size - 1
+    status = 200
+    if "Range" in request.headers and if_range_matches(
+        request, etag, last_modified
+    ):
+        try:
+            byte_range = parse_range(request.headers["Range"], stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416, headers=headers)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+    file = open(full_path, "rb")
+    file.seek(start)
+    response = FileResponse(
+        FileRange(file, end - start + 1),
+        status=status,
+        content_type=content_type,
+        headers=headers,
+    )
+    response["Content-Length"] = end - start + 1
+    return response
@@ -0,0 +1,21 @@
+from collections import Counter
+from threading import Lock
+
+_counters = Counter()
+_lock = Lock()
+
+
+def increment(name, value=1):
+    """Increments the named counter of the current process"""
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot():
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:13
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0006_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='reservation_created_at_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['play', '-show_time', '-id'], name='performance_play_show_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='reservation_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='play',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='play_title_upper_trgm_idx'),
+        ),
+    ]
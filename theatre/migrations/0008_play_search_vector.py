@@ -0,0 +1,82 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:16
+
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+
+PLAY_SEARCH_VECTOR_INDEX = "play_search_vector_idx"
+
+
+def related_names(queryset, expression):
+    return Coalesce(
+        Subquery(
+            queryset.filter(plays=OuterRef("pk"))
+            .order_by()
+            .values("plays")
+            .annotate(names=StringAgg(expression, delimiter=" "))
+            .values("names")
+        ),
+        Value(""),
+        output_field=TextField(),
+    )
+
+
+def fill_play_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Play = apps.get_model("theatre", "Play")
+    Genre = apps.get_model("theatre", "Genre")
+    Actor = apps.get_model("theatre", "Actor")
+
+    Play.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector(
+                related_names(Genre.objects, "name"),
+                weight="B",
+                config="english",
+            )
+            + SearchVector(
+                related_names(
+                    Actor.objects,
+                    Concat("first_name", Value(" "), "last_name"),
+                ),
+                weight="B",
+                config="english",
+            )
+            + SearchVector("description", weight="C", config="english")
+        )
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {PLAY_SEARCH_VECTOR_INDEX} "
+        "ON theatre_play USING gin (search_vector)"
+    )
+
+
+def drop_play_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS {PLAY_SEARCH_VECTOR_INDEX}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0007_filter_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='play',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            fill_play_search_vectors,
+            drop_play_search_vector_index,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0008_play_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='play',
+            name='image_variants',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
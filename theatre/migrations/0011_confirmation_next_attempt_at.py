@@ -0,0 +1,27 @@
+# Generated by Django 4.2.3 on 2026-10-18 11:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0010_reservation_confirmation'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reservationconfirmation',
+            name='confirmation_unsent_idx',
+        ),
+        migrations.AddField(
+            model_name='reservationconfirmation',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='reservationconfirmation',
+            index=models.Index(condition=models.Q(('sent_at', None)), fields=['next_attempt_at', 'id'], name='confirmation_unsent_idx'),
+        ),
+    ]
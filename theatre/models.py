@@ -1,9 +1,13 @@
 import os
-import uuid
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, OuterRef, Q, Subquery, Count
+from django.db.models.functions import Coalesce, Upper
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -28,7 +32,8 @@ class Genre(models.Model):
 
 def play_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
-    filename = f"{slugify(instance.title)}-{uuid.uuid4()}{extension}"
+    # the storage adds a hash of the content to keep names unique
+    filename = f"{slugify(instance.title)[:50] or 'play'}{extension}"
 
     return os.path.join("uploads/plays/", filename)
 
@@ -39,9 +44,20 @@ class Play(models.Model):
     actors = models.ManyToManyField(Actor, related_name="plays", blank=True)
     genres = models.ManyToManyField(Genre, related_name="plays", blank=True)
     image = models.ImageField(null=True, upload_to=play_image_file_path)
+    # paths of the scaled down copies of the image by variant name
+    image_variants = models.JSONField(default=dict, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["title", "id"], name="play_title_id_idx"),
+            # serves title__icontains, UPPER(title) LIKE UPPER(%s)
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="play_title_upper_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -72,9 +88,48 @@ class Performance(models.Model):
         related_name="performances",
     )
     show_time = models.DateTimeField()
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(
+                fields=["-show_time", "-id"],
+                name="performance_show_time_id_idx",
+            ),
+            models.Index(
+                fields=["play", "-show_time", "-id"],
+                name="performance_play_show_idx",
+            ),
+        ]
+
+    @staticmethod
+    def update_tickets_sold(performance_id, delta):
+        """Atomically shifts the denormalised sold tickets counter"""
+        Performance.objects.filter(id=performance_id).update(
+            tickets_sold=F("tickets_sold") + delta
+        )
+
+    @staticmethod
+    def reconcile_tickets_sold():
+        """Resets drifted sold tickets counters, returns how many were"""
+        actual_tickets_sold = Coalesce(
+            Subquery(
+                Ticket.objects.filter(performance=OuterRef("pk"))
+                .order_by()
+                .values("performance")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        drifted = Performance.objects.annotate(
+            actual_tickets_sold=actual_tickets_sold
+        ).exclude(tickets_sold=F("actual_tickets_sold"))
+
+        return Performance.objects.filter(
+            id__in=drifted.values("id")
+        ).update(tickets_sold=actual_tickets_sold)
 
     def __str__(self):
         return f"{self.play.title}"
@@ -92,6 +147,12 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="reservation_user_created_idx",
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -150,3 +211,33 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("performance", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class ReservationConfirmation(models.Model):
+    """
+    Outbox of reservation confirmation emails, written in the same
+    transaction as the tickets and sent by `manage.py send_confirmations`
+    """
+
+    reservation = models.OneToOneField(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name="confirmation",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=Q(sent_at=None),
+                name="confirmation_unsent_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Confirmation of reservation {self.reservation_id}"
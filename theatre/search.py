@@ -0,0 +1,146 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Concat
+
+from theatre.models import Actor, Genre, Play
+
+SEARCH_CONFIG = "english"
+
+# ts_rank default weights of the A, B, B and C labelled parts of a vector
+SEARCH_WEIGHTS = {
+    "title": 1.0,
+    "genres": 0.4,
+    "actors": 0.4,
+    "description": 0.2,
+}
+
+
+def search_terms(text):
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def _related_names(queryset, expression):
+    return Coalesce(
+        Subquery(
+            queryset.filter(plays=OuterRef("pk"))
+            .order_by()
+            .values("plays")
+            .annotate(names=StringAgg(expression, delimiter=" "))
+            .values("names")
+        ),
+        Value(""),
+        output_field=TextField(),
+    )
+
+
+def play_search_vector():
+    """Weighted vector over title, genre and actor names and description"""
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(
+            _related_names(Genre.objects, "name"),
+            weight="B",
+            config=SEARCH_CONFIG,
+        )
+        + SearchVector(
+            _related_names(
+                Actor.objects,
+                Concat("first_name", Value(" "), "last_name"),
+            ),
+            weight="B",
+            config=SEARCH_CONFIG,
+        )
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(play_ids):
+    """Rebuilds search vectors of the plays with a single UPDATE"""
+    if connection.vendor == "postgresql":
+        Play.objects.filter(id__in=play_ids).update(
+            search_vector=play_search_vector()
+        )
+
+
+def python_search(queryset, terms):
+    """
+    Pure Python stand-in for databases without full-text search.
+    Ranks every play of the queryset in memory, so it only suits
+    development and test catalogs.
+    """
+    ranks = {}
+    for play in queryset.prefetch_related("genres", "actors"):
+        fields = {
+            "title": search_terms(play.title),
+            "genres": search_terms(
+                " ".join(genre.name for genre in play.genres.all())
+            ),
+            "actors": search_terms(
+                " ".join(actor.full_name for actor in play.actors.all())
+            ),
+            "description": search_terms(play.description),
+        }
+        term_ranks = [
+            max(
+                (
+                    SEARCH_WEIGHTS[field]
+                    for field, words in fields.items()
+                    if any(word.startswith(term) for word in words)
+                ),
+                default=0,
+            )
+            for term in terms
+        ]
+        if all(term_ranks):
+            ranks[play.id] = sum(term_ranks)
+
+    return queryset.filter(id__in=ranks).annotate(
+        search_rank=Case(
+            *[When(id=pk, then=Value(rank)) for pk, rank in ranks.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+def search_plays(queryset, text):
+    """
+    Filters plays matching every word of the text as a prefix and
+    annotates them with `search_rank`
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor != "postgresql":
+        return python_search(queryset, terms)
+
+    query = SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+    # ts_rank returns real, widen it so cursor positions compare exactly
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=Cast(
+            SearchRank(F("search_vector"), query),
+            FloatField(),
+        )
+    )
@@ -0,0 +1,29 @@
+import base64
+
+
+def taken_places_bitmap(rows, seats_in_row, taken_places):
+    """
+    Packs taken (row, seat) pairs into a row-major bitset of
+    rows * seats_in_row bits, most significant bit first: the seat
+    (row, seat) is bit (row - 1) * seats_in_row + (seat - 1).
+    Places outside the hall, sold before it was made smaller, are left
+    out, as the bitmap has no bit for them.
+    """
+    bitmap = bytearray((rows * seats_in_row + 7) // 8)
+    for row, seat in taken_places:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            continue
+        index = (row - 1) * seats_in_row + seat - 1
+        bitmap[index // 8] |= 0x80 >> index % 8
+    return bytes(bitmap)
+
+
+def encode_seat_map(performance):
+    """Returns base64 encoded bitmap of the places taken for performance"""
+    theatre_hall = performance.theatre_hall
+    bitmap = taken_places_bitmap(
+        theatre_hall.rows,
+        theatre_hall.seats_in_row,
+        performance.tickets.values_list("row", "seat"),
+    )
+    return base64.b64encode(bitmap).decode()
@@ -1,4 +1,13 @@
-from django.db import transaction
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.encoding import filepath_to_uri
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -9,8 +18,13 @@ from theatre.models import (
     Play,
     TheatreHall,
     Ticket,
-    Reservation
+    Reservation,
+    ReservationConfirmation,
 )
+from theatre.cache import bump_version
+from theatre.holds import create_hold, release_hold, seats_held_by_others
+from theatre.images import schedule_variants
+from theatre.seatmap import encode_seat_map
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -34,6 +48,41 @@ class TheatreHallSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "rows", "seats_in_row", "capacity")
 
 
+def storage_url(name, request=None):
+    url = Play._meta.get_field("image").storage.url(name)
+    return request.build_absolute_uri(url) if request else url
+
+
+@extend_schema_field(OpenApiTypes.URI)
+class ImageVariantField(serializers.ReadOnlyField):
+    """URL of one variant of an image, null until it has been built"""
+
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        name = value.get(self.variant)
+        if not name:
+            return None
+        return storage_url(name, self.context.get("request"))
+
+
+@extend_schema_field({
+    "type": "object",
+    "additionalProperties": {"type": "string", "format": "uri"},
+})
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URLs of the variants of an image built so far by name"""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        return {
+            variant: storage_url(name, request)
+            for variant, name in value.items()
+        }
+
+
 class PlaySerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -58,6 +107,9 @@ class PlayListSerializer(PlaySerializer):
         read_only=True,
         slug_field="full_name"
     )
+    image_thumbnail = ImageVariantField(
+        "thumbnail", source="image_variants"
+    )
 
     class Meta:
         model = Play
@@ -68,12 +120,14 @@ class PlayListSerializer(PlaySerializer):
             "genres",
             "actors",
             "image",
+            "image_thumbnail",
         )
 
 
 class PlayDetailSerializer(PlaySerializer):
     genres = GenreSerializer(many=True, read_only=True)
     actors = ActorSerializer(many=True, read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Play
@@ -84,6 +138,7 @@ class PlayDetailSerializer(PlaySerializer):
             "genres",
             "actors",
             "image",
+            "image_variants",
         )
 
 
@@ -92,6 +147,20 @@ class PlayImageSerializer(serializers.ModelSerializer):
         model = Play
         fields = ("id", "image")
 
+    def update(self, instance, validated_data):
+        """Save the image and queue building its variants with it"""
+        replaced_variants = instance.image_variants
+        instance.image_variants = {}
+        with transaction.atomic():
+            play = super().update(instance, validated_data)
+            schedule_variants(play, replaced_variants)
+
+        return play
+
+
+class UploadProgressSerializer(serializers.Serializer):
+    received = serializers.IntegerField(read_only=True)
+
 
 class PerformanceSerializer(serializers.ModelSerializer):
 
@@ -110,6 +179,9 @@ class PerformanceListSerializer(PerformanceSerializer):
         source="play.title", read_only=True
     )
     play_image = serializers.ImageField(source="play.image", read_only=True)
+    play_image_thumbnail = ImageVariantField(
+        "thumbnail", source="play.image_variants"
+    )
     theatre_hall_name = serializers.CharField(
         source="theatre_hall.name",
         read_only=True
@@ -127,19 +199,158 @@ class PerformanceListSerializer(PerformanceSerializer):
             "show_time",
             "play_title",
             "play_image",
+            "play_image_thumbnail",
             "theatre_hall_name",
             "theatre_hall_capacity",
             "tickets_available",
         )
 
 
+class PerformanceListRows:
+    """
+    Renders `.values(*columns)` rows of performances exactly like
+    PerformanceListSerializer renders instances, without building its
+    field tree for every row
+    """
+
+    columns = (
+        "id",
+        "show_time",
+        "play__title",
+        "play__image",
+        "play__image_variants",
+        "theatre_hall__name",
+        "theatre_hall__rows",
+        "theatre_hall__seats_in_row",
+        "tickets_available",
+    )
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.request = (context or {}).get("request")
+        self.show_time = serializers.DateTimeField()
+        self.storage = Play._meta.get_field("image").storage
+
+        # File system urls only prepend the media url to the file path
+        self.media_prefix = None
+        if isinstance(self.storage, FileSystemStorage):
+            self.media_prefix = self.absolute_url(self.storage.base_url)
+
+    def absolute_url(self, url):
+        if self.request is None:
+            return url
+        return self.request.build_absolute_uri(url)
+
+    def image_url(self, name):
+        if not name:
+            return None
+
+        if self.media_prefix is not None:
+            return self.media_prefix + filepath_to_uri(name).lstrip("/")
+        return self.absolute_url(self.storage.url(name))
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "show_time": self.show_time.to_representation(row["show_time"]),
+            "play_title": row["play__title"],
+            "play_image": self.image_url(row["play__image"]),
+            "play_image_thumbnail": self.image_url(
+                row["play__image_variants"].get("thumbnail")
+            ),
+            "theatre_hall_name": row["theatre_hall__name"],
+            "theatre_hall_capacity": str(
+                row["theatre_hall__rows"] * row["theatre_hall__seats_in_row"]
+            ),
+            "tickets_available": row["tickets_available"],
+        }
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+
+SEATS_HELD_ERROR = "Some of the seats are held by another customer."
+
+
+def ticket_taken_error():
+    """Build the error Ticket.full_clean raises for an already taken seat"""
+    return Ticket().unique_error_message(
+        Ticket, Ticket._meta.unique_together[0]
+    )
+
+
+class TicketPerformanceField(serializers.PrimaryKeyRelatedField):
+    """Resolves performances from the batch loaded by the parent list"""
+
+    def to_internal_value(self, data):
+        batch = getattr(self.parent.parent, "performances", {})
+        if not isinstance(data, bool) and str(data) in batch:
+            return batch[str(data)]
+        return super().to_internal_value(data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """Validates a batch of tickets with a fixed number of queries"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            performance_ids = {
+                str(item.get("performance"))
+                for item in data
+                if isinstance(item, dict)
+            }
+            self.performances = {
+                str(performance.id): performance
+                for performance in Performance.objects.select_related(
+                    "theatre_hall"
+                ).filter(
+                    id__in=[pk for pk in performance_ids if pk.isdigit()]
+                )
+            }
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        seats = [
+            (ticket["performance"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs
+        ]
+        if len(set(seats)) != len(seats) or Ticket.objects.filter(
+            reduce(or_, (
+                Q(performance_id=performance_id, row=row, seat=seat)
+                for performance_id, row, seat in seats
+            ))
+        ).exists():
+            raise ticket_taken_error()
+
+        request = self.context.get("request")
+        user_id = request.user.id if request else None
+        performance_seats = defaultdict(list)
+        for performance_id, row, seat in seats:
+            performance_seats[performance_id].append((row, seat))
+        for performance_id, places in performance_seats.items():
+            if seats_held_by_others(performance_id, places, user_id):
+                raise ValidationError(SEATS_HELD_ERROR)
+        return attrs
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    performance = TicketPerformanceField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
+
+    def get_validators(self):
+        if isinstance(self.parent, TicketBatchSerializer):
+            # seats of the whole batch are checked in a single query
+            return []
+        return super().get_validators()
+
     def validate(self, attrs):
         data = super().validate(attrs=attrs)
         Ticket.validate_ticket(
             attrs["row"],
             attrs["seat"],
-            attrs["theatre_hall"].theatre_hall,
+            attrs["performance"].theatre_hall,
             ValidationError,
         )
         return data
@@ -152,10 +363,13 @@ class TicketSerializer(serializers.ModelSerializer):
             "seat",
             "performance"
         )
+        list_serializer_class = TicketBatchSerializer
 
 
 class TicketListSerializer(TicketSerializer):
-    performance = PerformanceListSerializer(many=False, read_only=True)
+    """Refers to performances side-loaded next to the reservations page"""
+
+    performance = serializers.PrimaryKeyRelatedField(read_only=True)
 
 
 class TicketSeatsSerializer(TicketSerializer):
@@ -184,6 +398,26 @@ class PerformanceDetailSerializer(PerformanceSerializer):
         )
 
 
+class PerformanceSeatMapSerializer(PerformanceDetailSerializer):
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Performance
+        fields = (
+            "id",
+            "show_time",
+            "play",
+            "theatre_hall",
+            "seat_map"
+        )
+
+    def get_seat_map(self, performance) -> dict:
+        return {
+            "encoding": "bitmap",
+            "data": encode_seat_map(performance),
+        }
+
+
 class ReservationSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(
         many=True,
@@ -199,14 +433,89 @@ class ReservationSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(
-                    reservation=reservation,
-                    **ticket_data
+            try:
+                Ticket.objects.bulk_create(
+                    Ticket(reservation=reservation, **ticket_data)
+                    for ticket_data in tickets_data
                 )
+            except IntegrityError:
+                raise ValidationError({
+                    "tickets": serializers.as_serializer_error(
+                        ticket_taken_error()
+                    )
+                })
+            tickets_sold = Counter(
+                ticket_data["performance"].id for ticket_data in tickets_data
+            )
+            for performance_id, count in tickets_sold.items():
+                Performance.update_tickets_sold(performance_id, count)
+            bump_version(Ticket, *tickets_sold)
+            # sent by the dispatcher, so mail delivery never holds it up
+            ReservationConfirmation.objects.create(reservation=reservation)
             return reservation
 
 
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    token = serializers.CharField(read_only=True)
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate(self, attrs):
+        data = super().validate(attrs=attrs)
+        seats = [(seat["row"], seat["seat"]) for seat in attrs["seats"]]
+        for row, seat in seats:
+            Ticket.validate_ticket(
+                row,
+                seat,
+                attrs["performance"].theatre_hall,
+                ValidationError,
+            )
+        if len(set(seats)) != len(seats):
+            raise ticket_taken_error()
+        return data
+
+    def create(self, validated_data):
+        performance = validated_data["performance"]
+        seats = [
+            (seat["row"], seat["seat"]) for seat in validated_data["seats"]
+        ]
+        hold = create_hold(
+            performance.id, self.context["request"].user.id, seats
+        )
+        if hold is None:
+            raise ValidationError(SEATS_HELD_ERROR)
+
+        if Ticket.objects.filter(
+            reduce(or_, (Q(row=row, seat=seat) for row, seat in seats)),
+            performance=performance,
+        ).exists():
+            release_hold(hold)
+            raise ValidationError(
+                serializers.as_serializer_error(ticket_taken_error())
+            )
+        return hold
+
+    def to_representation(self, hold):
+        return {
+            "token": hold.token,
+            "performance": hold.performance_id,
+            "seats": [
+                {"row": row, "seat": seat} for row, seat in hold.seats
+            ],
+            "expires_at": self.fields["expires_at"].to_representation(
+                hold.expires_at
+            ),
+        }
+
+
 class ReservationListSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
 
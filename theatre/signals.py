@@ -0,0 +1,104 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from theatre import metrics
+from theatre.cache import bump_version
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall, Ticket
+from theatre.search import update_search_vectors
+
+
+@receiver(post_save, sender=Ticket)
+def increment_tickets_sold(sender, instance, created, **kwargs):
+    if created:
+        Performance.update_tickets_sold(instance.performance_id, 1)
+    bump_version(Ticket, instance.performance_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def decrement_tickets_sold(sender, instance, **kwargs):
+    Performance.update_tickets_sold(instance.performance_id, -1)
+    bump_version(Ticket, instance.performance_id)
+
+
+@receiver(post_save, sender=Performance)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Play)
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=Performance)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Play)
+@receiver(post_delete, sender=TheatreHall)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def invalidate_play_catalog_cache(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_version(Play)
+
+
+@receiver(post_save, sender=Play)
+def update_play_search_vector(sender, instance, **kwargs):
+    update_search_vectors([instance.id])
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+def update_related_plays_search_vectors(sender, instance, **kwargs):
+    update_search_vectors(instance.plays.values("id"))
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+def remember_related_plays(sender, instance, **kwargs):
+    instance.related_play_ids = list(
+        instance.plays.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+def update_former_plays_search_vectors(sender, instance, **kwargs):
+    update_search_vectors(getattr(instance, "related_play_ids", []))
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def update_linked_plays_search_vectors(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action.startswith("post_"):
+            update_search_vectors([instance.id])
+    elif action == "pre_clear":
+        remember_related_plays(sender, instance)
+    elif action == "post_clear":
+        update_search_vectors(instance.related_play_ids)
+    elif action in ("post_add", "post_remove"):
+        update_search_vectors(pk_set)
+
+
+@receiver(connection_created)
+def count_connection_opened(sender, connection, **kwargs):
+    metrics.increment("db.connections_opened")
+
+
+@receiver(request_started)
+def count_connections_reused(sender, **kwargs):
+    # connected after close_old_connections, so whatever is still open
+    # here is a persistent connection the request is going to reuse
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            metrics.increment("db.connections_reused")
@@ -0,0 +1,45 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+# `<name>.<hash>.<extension>` as written by HashedFileSystemStorage
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}(?=\.[^./]+$)")
+
+
+def is_hashed(name):
+    return HASHED_NAME.search(name) is not None
+
+
+def unhashed_name(name):
+    """The name a file was saved under, before its hash was added"""
+    return HASHED_NAME.sub("", name)
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """
+    Saves files under names carrying a hash of their content, like
+    `uploads/plays/hamlet.3f2a9c1b4d5e.jpg`, so that a name always
+    refers to the same bytes and responses may be cached forever
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        root, extension = os.path.splitext(name)
+        name = f"{root}.{digest.hexdigest()[:12]}{extension}"
+
+        return super().save(name, content, max_length)
+
+    def get_alternative_name(self, file_root, file_ext):
+        # keeps the hash right before the extension
+        root, digest = os.path.splitext(file_root)
+        return super().get_alternative_name(root, digest + file_ext)
@@ -0,0 +1,129 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import Performance, Play, TheatreHall
+from theatre.views import PerformanceViewSet, PlayViewSet
+
+PERFORMANCE_URL = reverse("theatre:performance-list")
+PLAY_URL = reverse("theatre:play-list")
+
+
+@override_settings(ASYNC_VIEWS=True)
+def async_view(viewset, actions):
+    return viewset.as_view(actions)
+
+
+class AsyncReadViewsTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        token = AccessToken.for_user(user)
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.factory = AsyncRequestFactory()
+        self.play = Play.objects.create(title="Hamlet", description="")
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=TheatreHall.objects.create(
+                name="Main hall", rows=20, seats_in_row=20
+            ),
+            show_time="2023-07-21 14:00:00+00:00",
+        )
+
+    def get(self, url, data=None, headers=None):
+        return self.factory.get(
+            url, data, headers={**self.headers, **(headers or {})}
+        )
+
+    def test_routes_are_sync_without_async_views(self):
+        self.assertFalse(
+            asyncio.iscoroutinefunction(resolve(PERFORMANCE_URL).func)
+        )
+
+    def test_read_actions_are_async(self):
+        self.assertTrue(
+            asyncio.iscoroutinefunction(
+                async_view(PerformanceViewSet, {"get": "list"})
+            )
+        )
+        self.assertFalse(
+            asyncio.iscoroutinefunction(
+                async_view(PlayViewSet, {"post": "upload_image"})
+            )
+        )
+
+    async def test_list_performances(self):
+        view = async_view(PerformanceViewSet, {"get": "list"})
+
+        res = await view(self.get(PERFORMANCE_URL))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [performance["id"] for performance in res.data["results"]],
+            [self.performance.id],
+        )
+
+    async def test_retrieve_play(self):
+        view = async_view(PlayViewSet, {"get": "retrieve"})
+        url = reverse("theatre:play-detail", args=[self.play.id])
+
+        res = await view(self.get(url), pk=str(self.play.id))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["title"], "Hamlet")
+        self.assertEqual(res["X-Cache"], "MISS")
+
+    async def test_retrieve_missing_performance(self):
+        view = async_view(PerformanceViewSet, {"get": "retrieve"})
+        url = reverse("theatre:performance-detail", args=[0])
+
+        res = await view(self.get(url), pk="0")
+
+        self.assertEqual(res.status_code, 404)
+
+    @mock.patch("theatre.search.connection", vendor="sqlite")
+    async def test_search_without_full_text_search(self, connection):
+        view = async_view(PlayViewSet, {"get": "list"})
+
+        res = await view(self.get(PLAY_URL, {"q": "ham"}))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [play["id"] for play in res.data["results"]], [self.play.id]
+        )
+
+    async def test_conditional_list(self):
+        view = async_view(PlayViewSet, {"get": "list"})
+        res = await view(self.get(PLAY_URL))
+
+        not_modified = await view(
+            self.get(PLAY_URL, headers={"If-None-Match": res["ETag"]})
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_authentication_required(self):
+        view = async_view(PerformanceViewSet, {"get": "list"})
+
+        res = await view(self.factory.get(PERFORMANCE_URL))
+
+        self.assertEqual(res.status_code, 401)
+
+    async def test_write_falls_back_to_sync_view(self):
+        view = async_view(PlayViewSet, {"get": "list", "post": "create"})
+
+        res = await view(
+            self.factory.post(
+                PLAY_URL,
+                {"title": "Macbeth", "description": ""},
+                headers=self.headers,
+            )
+        )
+
+        self.assertEqual(res.status_code, 403)
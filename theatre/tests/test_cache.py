@@ -0,0 +1,234 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre import metrics
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+GENRE_URL = reverse("theatre:genre-list")
+PLAY_URL = reverse("theatre:play-list")
+METRICS_URL = reverse("theatre:metrics")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+
+
+def sample_performance(**params):
+    play = Play.objects.create(title="Title")
+    theatre_hall = TheatreHall.objects.create(
+        name="Main hall", rows=20, seats_in_row=20
+    )
+
+    defaults = {
+        "show_time": "2023-07-21 14:00:00+00:00",
+        "play": play,
+        "theatre_hall": theatre_hall,
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+def performance_detail_url(performance_id):
+    return reverse("theatre:performance-detail", args=[performance_id])
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_response_is_cached(self):
+        Genre.objects.create(name="Genre 1")
+
+        res = self.client.get(GENRE_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            cached_res = self.client.get(GENRE_URL)
+
+        self.assertEqual(cached_res["X-Cache"], "HIT")
+        self.assertEqual(cached_res.data, res.data)
+        self.assertEqual(metrics.snapshot()["catalog_cache.hits"], 1)
+        self.assertEqual(metrics.snapshot()["catalog_cache.misses"], 1)
+
+    def test_cache_keyed_by_query_params(self):
+        sample_play = Play.objects.create(title="Hamlet", description="")
+        Play.objects.create(title="Macbeth", description="")
+
+        res = self.client.get(PLAY_URL, {"title": "ham"})
+        other_res = self.client.get(PLAY_URL, {"title": "mac"})
+
+        self.assertEqual(other_res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["id"], sample_play.id)
+        self.assertNotEqual(res.data, other_res.data)
+
+    def test_save_and_delete_invalidate_cache(self):
+        genre = Genre.objects.create(name="Genre 1")
+        self.client.get(GENRE_URL)
+
+        genre.name = "Genre 2"
+        genre.save()
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data[0]["name"], "Genre 2")
+
+        genre.delete()
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data, [])
+
+    def test_m2m_and_related_changes_invalidate_play_cache(self):
+        play = Play.objects.create(title="Hamlet", description="")
+        actor = Actor.objects.create(first_name="First", last_name="Last")
+        self.client.get(PLAY_URL)
+
+        play.actors.add(actor)
+        res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["actors"], ["First Last"])
+
+        actor.last_name = "Changed"
+        actor.save()
+        res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.data["results"][0]["actors"], ["First Changed"])
+
+    def test_metrics_admin_only(self):
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        self.client.get(GENRE_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["catalog_cache.misses"], 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_not_modified_without_queries(self):
+        sample_performance()
+        res = self.client.get(PERFORMANCE_URL)
+
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                PERFORMANCE_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_etag_depends_on_query_params(self):
+        res = self.client.get(PLAY_URL)
+        other_res = self.client.get(PLAY_URL, {"title": "ham"})
+
+        self.assertNotEqual(res["ETag"], other_res["ETag"])
+
+    def test_etag_changes_on_write(self):
+        play = Play.objects.create(title="Hamlet", description="")
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        play.title = "Macbeth"
+        play.save()
+        res = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_response_built_before_commit_is_not_reused(self):
+        performance = sample_performance()
+        url = performance_detail_url(performance.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.objects.create(user=self.user).tickets.create(
+                row=1, seat=1, performance=performance
+            )
+            # other connections see the old tickets until the commit
+            etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_ticket_changes_scoped_to_performance(self):
+        performance = sample_performance()
+        other_performance = sample_performance()
+        list_etag = self.client.get(PERFORMANCE_URL)["ETag"]
+        detail_etag = self.client.get(
+            performance_detail_url(performance.id)
+        )["ETag"]
+        other_detail_etag = self.client.get(
+            performance_detail_url(other_performance.id)
+        )["ETag"]
+
+        self.client.post(
+            reverse("theatre:reservation-list"),
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": performance.id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertNotEqual(
+            self.client.get(PERFORMANCE_URL)["ETag"], list_etag
+        )
+        self.assertNotEqual(
+            self.client.get(performance_detail_url(performance.id))["ETag"],
+            detail_etag,
+        )
+        self.assertEqual(
+            self.client.get(
+                performance_detail_url(other_performance.id)
+            )["ETag"],
+            other_detail_etag,
+        )
+
+        detail_etag = self.client.get(
+            performance_detail_url(performance.id)
+        )["ETag"]
+        Reservation.objects.get().delete()
+
+        self.assertFalse(Ticket.objects.exists())
+        self.assertNotEqual(
+            self.client.get(performance_detail_url(performance.id))["ETag"],
+            detail_etag,
+        )
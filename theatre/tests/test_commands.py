@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+
+class ReconcileTicketsSoldCommandTests(TestCase):
+    def test_reconcile_tickets_sold(self):
+        theatre_hall = TheatreHall.objects.create(
+            name="Test Theatre", rows=5, seats_in_row=10
+        )
+        play = Play.objects.create(title="Test Play")
+        performance = Performance.objects.create(
+            play=play,
+            theatre_hall=theatre_hall,
+            show_time="2023-07-21 19:30:00+00:00",
+        )
+        empty_performance = Performance.objects.create(
+            play=play,
+            theatre_hall=theatre_hall,
+            show_time="2023-07-22 19:30:00+00:00",
+        )
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        reservation = Reservation.objects.create(user=user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=performance, reservation=reservation
+        )
+        Performance.objects.filter(id=performance.id).update(tickets_sold=7)
+        Performance.objects.filter(id=empty_performance.id).update(
+            tickets_sold=3
+        )
+        out = StringIO()
+
+        call_command("reconcile_tickets_sold", stdout=out)
+
+        performance.refresh_from_db()
+        empty_performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 1)
+        self.assertEqual(empty_performance.tickets_sold, 0)
+        self.assertIn("Reconciled 2 performance(s)", out.getvalue())
+
+
+class GenerateImageVariantsCommandTests(TestCase):
+    @mock.patch("theatre.management.commands.generate_image_variants"
+                ".generate_variants")
+    def test_generate_missing_variants(self, generate_variants):
+        play = Play.objects.create(title="Hamlet", image="hamlet.jpg")
+        Play.objects.create(
+            title="Macbeth",
+            image="macbeth.jpg",
+            image_variants={"thumbnail": "macbeth.thumbnail.jpg"},
+        )
+        Play.objects.create(title="Othello")
+        out = StringIO()
+
+        call_command("generate_image_variants", stdout=out)
+
+        generate_variants.assert_called_once_with(play.id, "hamlet.jpg")
+        self.assertIn("Built variants of 1 image(s)", out.getvalue())
+
+
+@mock.patch("theatre.management.commands.wait_for_db.time.sleep")
+@mock.patch("theatre.management.commands.wait_for_db.connections")
+class WaitForDbCommandTests(SimpleTestCase):
+    def test_wait_for_db_ready(self, patched_connections, patched_sleep):
+        call_command("wait_for_db", stdout=StringIO())
+
+        connection = patched_connections.__getitem__.return_value
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with("SELECT 1")
+        patched_sleep.assert_not_called()
+
+    def test_wait_for_db_delay(self, patched_connections, patched_sleep):
+        connection = patched_connections.__getitem__.return_value
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.side_effect = [OperationalError] * 3 + [None]
+
+        call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(cursor.execute.call_count, 4)
+        self.assertEqual(connection.close.call_count, 3)
+        self.assertEqual(patched_sleep.call_count, 3)
+
+    def test_wait_for_db_timeout(self, patched_connections, patched_sleep):
+        connection = patched_connections.__getitem__.return_value
+        connection.cursor.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
@@ -0,0 +1,205 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from theatre import confirmations
+from theatre.confirmations import message_id
+from theatre.models import (
+    Performance,
+    Play,
+    ReservationConfirmation,
+    TheatreHall,
+)
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def send_confirmations(*args):
+    out = StringIO()
+    call_command("send_confirmations", *args, stdout=out)
+    return out.getvalue()
+
+
+@override_settings(TASKS_RETRY_BACKOFF=10, CONFIRMATION_MAX_ATTEMPTS=3)
+class ReservationConfirmationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "buyer@test.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Main hall", rows=10, seats_in_row=10
+            ),
+            show_time="2023-07-21 19:30:00+00:00",
+        )
+
+    def reserve(self, row=1, seat=1):
+        return self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {
+                        "row": row,
+                        "seat": seat,
+                        "performance": self.performance.id,
+                    }
+                ]
+            },
+            format="json",
+        )
+
+    def make_due(self):
+        ReservationConfirmation.objects.update(next_attempt_at=timezone.now())
+
+    def test_reservation_queues_confirmation_without_sending(self):
+        res = self.reserve()
+
+        self.assertEqual(res.status_code, 201)
+        confirmation = ReservationConfirmation.objects.get()
+        self.assertEqual(confirmation.reservation_id, res.data["id"])
+        self.assertIsNone(confirmation.sent_at)
+        self.assertEqual(mail.outbox, [])
+
+    def test_rejected_reservation_queues_no_confirmation(self):
+        self.reserve()
+
+        res = self.reserve()
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(ReservationConfirmation.objects.count(), 1)
+
+    def test_dispatcher_sends_confirmation_once(self):
+        reservation_id = self.reserve().data["id"]
+
+        out = send_confirmations()
+
+        self.assertIn("Sent 1 confirmation(s), 0 failed", out)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ["buyer@test.com"])
+        self.assertEqual(
+            message.subject, f"Reservation #{reservation_id} confirmed"
+        )
+        self.assertIn("Hamlet, 2023-07-21 19:30, row 1, seat 1", message.body)
+        self.assertEqual(
+            message.extra_headers["Message-ID"], message_id(reservation_id)
+        )
+        self.assertIsNotNone(ReservationConfirmation.objects.get().sent_at)
+
+        send_confirmations()
+
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_dispatcher_sends_in_batches(self):
+        for seat in range(1, 6):
+            self.reserve(seat=seat)
+
+        with mock.patch(
+            "theatre.confirmations.get_connection",
+            wraps=mail.get_connection,
+        ) as get_connection:
+            out = send_confirmations("--batch-size", "2")
+
+        self.assertIn("Sent 5 confirmation(s)", out)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(get_connection.call_count, 3)
+
+    @mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.send_messages",
+        side_effect=ConnectionRefusedError,
+    )
+    def test_failed_confirmation_is_retried_later(self, send_messages):
+        self.reserve()
+
+        with self.assertLogs("theatre.confirmations", "ERROR"):
+            out = send_confirmations()
+
+        self.assertIn("Sent 0 confirmation(s), 1 failed", out)
+        confirmation = ReservationConfirmation.objects.get()
+        self.assertIsNone(confirmation.sent_at)
+        self.assertEqual(confirmation.attempts, 1)
+        self.assertIn("ConnectionRefusedError", confirmation.last_error)
+        self.assertGreater(
+            confirmation.next_attempt_at,
+            timezone.now() + timedelta(seconds=5),
+        )
+
+        send_confirmations()
+        self.assertEqual(send_messages.call_count, 1)
+
+        for _ in range(2):
+            self.make_due()
+            with self.assertLogs("theatre.confirmations", "ERROR"):
+                send_confirmations()
+        self.make_due()
+        send_confirmations()
+
+        self.assertEqual(send_messages.call_count, 3)
+        self.assertEqual(ReservationConfirmation.objects.get().attempts, 3)
+
+    @mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.open",
+        side_effect=ConnectionRefusedError,
+    )
+    def test_unreachable_backend_puts_batch_off(self, open_connection):
+        for seat in range(1, 3):
+            self.reserve(seat=seat)
+
+        with self.assertLogs("theatre.confirmations", "ERROR"):
+            out = send_confirmations()
+
+        self.assertIn("Sent 0 confirmation(s), 2 failed", out)
+        self.assertEqual(mail.outbox, [])
+        for confirmation in ReservationConfirmation.objects.all():
+            self.assertEqual(confirmation.attempts, 1)
+            self.assertGreater(confirmation.next_attempt_at, timezone.now())
+
+        open_connection.side_effect = None
+        self.make_due()
+        out = send_confirmations()
+
+        self.assertIn("Sent 2 confirmation(s), 0 failed", out)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_stopped_dispatcher_sends_rest_after_lease(self):
+        for seat in range(1, 4):
+            self.reserve(seat=seat)
+        sent = []
+
+        def send_messages(messages):
+            if len(sent) == 2:
+                raise SystemExit
+            sent.extend(messages)
+            return len(messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=send_messages,
+        ):
+            with self.assertRaises(SystemExit):
+                confirmations.send_confirmations(100)
+
+        outbox = ReservationConfirmation.objects.order_by("id")
+        self.assertEqual(
+            [confirmation.sent_at is not None for confirmation in outbox],
+            [True, True, False],
+        )
+        unsent = outbox[2]
+        self.assertGreater(unsent.next_attempt_at, timezone.now())
+        self.assertEqual(confirmations.send_confirmations(100), (0, 0))
+
+        self.make_due()
+        self.assertEqual(confirmations.send_confirmations(100), (1, 0))
+        unsent.refresh_from_db()
+        self.assertEqual(unsent.attempts, 2)
@@ -0,0 +1,27 @@
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from theatre import metrics
+
+
+class ConnectionMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_opened_connection_is_counted(self):
+        connection_created.send(
+            sender=connection.__class__, connection=connection
+        )
+
+        self.assertEqual(metrics.snapshot(), {"db.connections_opened": 1})
+
+    def test_reused_connection_is_counted(self):
+        connection.ensure_connection()
+
+        APIClient().get(reverse("theatre:genre-list"))
+
+        self.assertEqual(metrics.snapshot()["db.connections_reused"], 1)
+        self.assertNotIn("db.connections_opened", metrics.snapshot())
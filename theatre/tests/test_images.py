@@ -0,0 +1,133 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from theatre.images import VARIANTS, generate_variants
+from theatre.models import Play
+
+PLAY_URL = reverse("theatre:play-list")
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="theatre-media-")
+
+
+def image_file(name="poster.png", size=(2000, 3000), mode="RGBA"):
+    output = BytesIO()
+    Image.new(mode, size, "red").save(output, "PNG")
+    return SimpleUploadedFile(name, output.getvalue(), "image/png")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+        self.play = Play.objects.create(title="Hamlet", description="")
+        self.upload_url = reverse(
+            "theatre:play-upload-image", args=[self.play.id]
+        )
+
+    def upload(self, file):
+        res = self.client.post(
+            self.upload_url, {"image": file}, format="multipart"
+        )
+        self.assertEqual(res.status_code, 200)
+        call_command(
+            "run_tasks", "--burst", "--concurrency", "1", stdout=StringIO()
+        )
+        self.play.refresh_from_db()
+
+    def test_variants_are_scaled_down(self):
+        self.upload(image_file())
+
+        self.assertEqual(set(self.play.image_variants), set(VARIANTS))
+        storage = self.play.image.storage
+        for variant, box in VARIANTS.items():
+            name = self.play.image_variants[variant]
+            self.assertRegex(name, rf"\.{variant}\.[0-9a-f]{{12}}\.jpg$")
+            with storage.open(name) as file, Image.open(file) as image:
+                self.assertEqual(image.format, "JPEG")
+                self.assertEqual(image.size, box)
+
+    def test_variants_are_built_by_task_workers(self):
+        self.client.post(
+            self.upload_url, {"image": image_file()}, format="multipart"
+        )
+
+        self.play.refresh_from_db()
+        self.assertTrue(self.play.image)
+        self.assertEqual(self.play.image_variants, {})
+        task = Task.objects.get()
+        self.assertEqual(task.name, "theatre.images.generate_variants")
+        self.assertEqual(task.args, [self.play.id, self.play.image.name])
+
+    def test_replaced_image_variants_are_deleted(self):
+        self.upload(image_file())
+        replaced = self.play.image_variants
+
+        self.upload(image_file("other.png"))
+
+        storage = self.play.image.storage
+        for name in replaced.values():
+            self.assertFalse(storage.exists(name))
+        for name in self.play.image_variants.values():
+            self.assertTrue(storage.exists(name))
+
+    def test_outdated_variants_are_discarded(self):
+        self.upload(image_file())
+        name = self.play.image.name
+        Play.objects.filter(id=self.play.id).update(
+            image="uploads/plays/other.png", image_variants={}
+        )
+
+        generate_variants(self.play.id, name)
+
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_variants, {})
+
+    def test_rebuilt_variants_replace_earlier(self):
+        self.upload(image_file())
+        earlier = self.play.image_variants
+
+        generate_variants(self.play.id, self.play.image.name)
+
+        self.play.refresh_from_db()
+        storage = self.play.image.storage
+        for variant, name in self.play.image_variants.items():
+            self.assertNotEqual(name, earlier[variant])
+            self.assertTrue(storage.exists(name))
+            self.assertFalse(storage.exists(earlier[variant]))
+
+    def test_lists_link_thumbnails(self):
+        res = self.client.get(PLAY_URL)
+        self.assertIsNone(res.data["results"][0]["image_thumbnail"])
+
+        self.upload(image_file())
+
+        res = self.client.get(PLAY_URL)
+        self.assertEqual(
+            res.data["results"][0]["image_thumbnail"],
+            "http://testserver/media/"
+            + self.play.image_variants["thumbnail"],
+        )
+
+        url = reverse("theatre:play-detail", args=[self.play.id])
+        res = self.client.get(url)
+        self.assertEqual(set(res.data["image_variants"]), set(VARIANTS))
@@ -0,0 +1,150 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from theatre.storage import HashedFileSystemStorage, unhashed_name
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="theatre-media-")
+CONTENT = b"0123456789" * 10
+
+
+class HashedFileSystemStorageTests(SimpleTestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp(prefix="theatre-media-")
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        self.storage = HashedFileSystemStorage(location=location)
+
+    def test_name_carries_content_hash(self):
+        name = self.storage.save("plays/hamlet.jpg", ContentFile(CONTENT))
+
+        self.assertRegex(name, r"^plays/hamlet\.[0-9a-f]{12}\.jpg$")
+        self.assertEqual(unhashed_name(name), "plays/hamlet.jpg")
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), CONTENT)
+
+    def test_same_content_gets_its_own_file(self):
+        first = self.storage.save("plays/othello.jpg", ContentFile(CONTENT))
+        second = self.storage.save("plays/othello.jpg", ContentFile(CONTENT))
+
+        self.assertNotEqual(first, second)
+        self.assertRegex(second, r"^plays/othello_\w{7}\.[0-9a-f]{12}\.jpg$")
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT, MEDIA_OFFLOAD_HEADER="", ALLOWED_HOSTS=["*"]
+)
+class ServeMediaTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        storage = HashedFileSystemStorage(location=MEDIA_ROOT)
+        cls.name = storage.save("plays/macbeth.jpg", ContentFile(CONTENT))
+        with open(f"{MEDIA_ROOT}/legacy.jpg", "wb") as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def url(self, name):
+        return reverse("media", args=[name])
+
+    def test_hashed_file_is_immutable(self):
+        res = self.client.get(self.url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+    def test_unhashed_file_is_cached_briefly(self):
+        res = self.client.get(self.url("legacy.jpg"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Cache-Control"], "public, max-age=86400")
+
+    def test_conditional_request(self):
+        res = self.client.get(self.url(self.name))
+
+        not_modified = self.client.get(
+            self.url(self.name), headers={"If-None-Match": res["ETag"]}
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], res["ETag"])
+
+    def test_range_request(self):
+        for header, content in (
+            ("bytes=10-19", CONTENT[10:20]),
+            ("bytes=95-", CONTENT[95:]),
+            ("bytes=-5", CONTENT[-5:]),
+            ("bytes=90-200", CONTENT[90:]),
+        ):
+            with self.subTest(header):
+                res = self.client.get(
+                    self.url(self.name), headers={"Range": header}
+                )
+
+                self.assertEqual(res.status_code, 206)
+                self.assertEqual(b"".join(res.streaming_content), content)
+                self.assertEqual(res["Content-Length"], str(len(content)))
+
+        res = self.client.get(
+            self.url(self.name), headers={"Range": "bytes=10-19"}
+        )
+        self.assertEqual(res["Content-Range"], "bytes 10-19/100")
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(
+            self.url(self.name), headers={"Range": "bytes=100-"}
+        )
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], "bytes */100")
+
+    def test_range_of_changed_file_sends_whole_file(self):
+        res = self.client.get(
+            self.url(self.name),
+            headers={"Range": "bytes=10-19", "If-Range": '"outdated"'},
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+
+    def test_missing_file(self):
+        for name in ("plays/missing.jpg", "plays", "../etc/passwd"):
+            with self.subTest(name):
+                res = self.client.get(self.url(name))
+
+                self.assertEqual(res.status_code, 404)
+
+    def test_only_safe_methods(self):
+        res = self.client.post(self.url(self.name))
+
+        self.assertEqual(res.status_code, 405)
+
+    @override_settings(MEDIA_OFFLOAD_HEADER="X-Accel-Redirect")
+    def test_offload_to_proxy(self):
+        res = self.client.get(self.url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{self.name}"
+        )
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+    @override_settings(MEDIA_OFFLOAD_HEADER="X-Sendfile")
+    def test_offload_to_sendfile(self):
+        res = self.client.get(self.url(self.name))
+
+        self.assertEqual(res["X-Sendfile"], f"{MEDIA_ROOT}/{self.name}")
@@ -100,3 +100,34 @@ class TicketModelTests(TestCase):
 
         expected_str = f"{str(performance)} (row: 2, seat: 5)"
         self.assertEqual(str(ticket), expected_str)
+
+    def test_ticket_create_and_delete_update_tickets_sold(self):
+        theatre_hall = TheatreHall.objects.create(
+            name="Test Theatre", rows=5, seats_in_row=10
+        )
+        play = Play.objects.create(title="Test Play")
+        performance = Performance.objects.create(
+            play=play,
+            theatre_hall=theatre_hall,
+            show_time=datetime(2023, 7, 21, 19, 30)
+        )
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        reservation = Reservation.objects.create(user=user)
+        ticket = Ticket.objects.create(
+            row=2, seat=5, performance=performance, reservation=reservation
+        )
+        Ticket.objects.create(
+            row=2, seat=6, performance=performance, reservation=reservation
+        )
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 2)
+
+        ticket.delete()
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 1)
+
+        reservation.delete()
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 0)
@@ -0,0 +1,105 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from theatre.views import (
+    PerformancePagination,
+    PerformanceViewSet,
+    PlayPagination,
+    PlayViewSet,
+    ReservationPagination,
+    ReservationViewSet,
+)
+
+
+def page_queryset(viewset_class, pagination_class, params, user=None):
+    """Returns the first page query of the viewset list action"""
+    request = Request(APIRequestFactory().get("/", params))
+    request.user = user
+    view = viewset_class(
+        request=request, action="list", format_kwarg=None, kwargs={}
+    )
+    return view.get_queryset().order_by(
+        *pagination_class.ordering
+    )[:pagination_class.page_size + 1]
+
+
+@skipUnless(connection.vendor == "postgresql", "plans of PostgreSQL")
+class QueryPlanTests(TestCase):
+    """
+    Checks that the filter paths of list endpoints are able to use
+    their indexes. Sequential scans are disabled as the test tables
+    are far too small for the planner to prefer an index otherwise.
+    """
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertFiltersByIndex(self, queryset, index_name, column):
+        """Asserts the plan looks the column up in the index"""
+        plan = queryset.explain().splitlines()
+        index_conditions = [
+            condition.strip()
+            for scan, condition in zip(plan, plan[1:])
+            if f" on {index_name} " in scan
+        ]
+        self.assertTrue(index_conditions, "\n".join(plan))
+        self.assertIn("Index Cond", index_conditions[0])
+        self.assertIn(column, index_conditions[0])
+
+    def assertFiltersByAnyIndex(self, queryset, *conditions):
+        """
+        Asserts some index scan of the plan looks up all the conditions,
+        whichever index the planner picks
+        """
+        plan = queryset.explain()
+        self.assertTrue(
+            any(
+                line.strip().startswith("Index Cond")
+                and all(condition in line for condition in conditions)
+                for line in plan.splitlines()
+            ),
+            plan,
+        )
+
+    def test_performances_by_date(self):
+        queryset = page_queryset(
+            PerformanceViewSet, PerformancePagination, {"date": "2023-07-21"}
+        )
+
+        # by show time, or by play and show time for every play
+        self.assertFiltersByAnyIndex(queryset, "show_time >=", "show_time <")
+
+    def test_performances_by_play(self):
+        queryset = page_queryset(
+            PerformanceViewSet, PerformancePagination, {"play": "1"}
+        )
+
+        self.assertFiltersByIndex(
+            queryset, "performance_play_show_idx", "play_id ="
+        )
+
+    def test_reservations_of_user(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        queryset = page_queryset(
+            ReservationViewSet, ReservationPagination, {}, user=user
+        )
+
+        self.assertFiltersByIndex(
+            queryset, "reservation_user_created_idx", "user_id ="
+        )
+
+    def test_plays_by_title(self):
+        queryset = page_queryset(PlayViewSet, PlayPagination, {"title": "ham"})
+
+        self.assertFiltersByIndex(
+            queryset, "play_title_upper_trgm_idx", "upper"
+        )
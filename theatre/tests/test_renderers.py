@@ -0,0 +1,74 @@
+import io
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from theatre.renderers import FastJSONParser, FastJSONRenderer
+
+PAYLOAD = ReturnDict(
+    {
+        "id": 1,
+        "title": "Hamlet\u2028Prince of Denmark",
+        "show_time": datetime(2023, 7, 21, 14, 0, 0, 123456, timezone.utc),
+        "local_time": datetime(
+            2023, 7, 21, 14, 0, tzinfo=timezone(timedelta(hours=3))
+        ),
+        "date": datetime(2023, 7, 21).date(),
+        "price": Decimal("12.50"),
+        "rate": 0.1,
+        "seats": {1: [1, 2], 2: []},
+        "genres": ["Tragédie", gettext_lazy("Drama")],
+        "errors": [ErrorDetail("This field is required.", code="required")],
+        "image": None,
+        "sold_out": False,
+    },
+    serializer=None,
+)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_renders_same_bytes_as_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_renders_indented_with_stdlib(self):
+        media_type = "application/json; indent=4"
+
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD, media_type),
+            JSONRenderer().render(PAYLOAD, media_type),
+        )
+
+    def test_renders_without_orjson(self):
+        with mock.patch("theatre.renderers.orjson", None):
+            self.assertEqual(
+                FastJSONRenderer().render(PAYLOAD),
+                JSONRenderer().render(PAYLOAD),
+            )
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), parser_context={})
+
+    def test_parses_same_data_as_json_parser(self):
+        body = '{"tickets": [{"row": 1, "seat": 2}], "note": "Тест"}'
+        body = body.encode()
+
+        self.assertEqual(
+            self.parse(FastJSONParser(), body),
+            self.parse(JSONParser(), body),
+        )
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            self.parse(FastJSONParser(), b'{"tickets": ')
@@ -1,12 +1,21 @@
+import base64
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from theatre.models import Performance, TheatreHall, Play
+from theatre.models import (
+    Performance,
+    TheatreHall,
+    Play,
+    Reservation,
+    Ticket,
+)
+from theatre.serializers import PerformanceListSerializer
+from theatre.views import PerformanceViewSet
 
 PERFORMANCE_URL = reverse("theatre:performance-list")
 
@@ -56,11 +65,207 @@ class AuthenticatedPerformanceApiTests(TestCase):
         res = self.client.get(PERFORMANCE_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn("play_title", res.data[0])
-        self.assertIn("play_image", res.data[0])
-        self.assertIn("theatre_hall_name", res.data[0])
-        self.assertIn("theatre_hall_capacity", res.data[0])
-        self.assertIn("tickets_available", res.data[0])
+        self.assertIn("play_title", res.data["results"][0])
+        self.assertIn("play_image", res.data["results"][0])
+        self.assertIn("theatre_hall_name", res.data["results"][0])
+        self.assertIn("theatre_hall_capacity", res.data["results"][0])
+        self.assertIn("tickets_available", res.data["results"][0])
+
+    def test_list_performances_cursor_pagination(self):
+        play = Play.objects.create(title="Title")
+        theatre_hall = TheatreHall.objects.create(
+            name="Main hall", rows=20, seats_in_row=20
+        )
+        Performance.objects.bulk_create(
+            Performance(
+                play=play,
+                theatre_hall=theatre_hall,
+                show_time=f"2023-07-{21 + i % 3} 14:00:00+00:00",
+            )
+            for i in range(25)
+        )
+        expected_ids = list(
+            Performance.objects.order_by(
+                "-show_time", "-id"
+            ).values_list("id", flat=True)
+        )
+
+        ids = []
+        url = PERFORMANCE_URL + "?page_size=10"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            ids += [performance["id"] for performance in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(ids, expected_ids)
+
+    def assertListedPerformances(self, params, expected_performances):
+        res = self.client.get(PERFORMANCE_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [performance["id"] for performance in res.data["results"]],
+            [performance.id for performance in expected_performances],
+        )
+
+    def test_filter_performances_by_date_range(self):
+        performance1 = sample_performance(
+            show_time="2023-07-17 10:00:00+00:00"
+        )
+        performance2 = sample_performance(
+            show_time="2023-07-21 23:59:00+00:00"
+        )
+        performance3 = sample_performance(
+            show_time="2023-07-24 00:00:00+00:00"
+        )
+
+        self.assertListedPerformances(
+            {"date": "2023-07-21"}, [performance2]
+        )
+        self.assertListedPerformances(
+            {"from": "2023-07-21"}, [performance3, performance2]
+        )
+        self.assertListedPerformances(
+            {"to": "2023-07-21"}, [performance2, performance1]
+        )
+        self.assertListedPerformances(
+            {"from": "2023-07-18", "to": "2023-07-24"},
+            [performance3, performance2],
+        )
+        self.assertListedPerformances(
+            {"week": "2023-W29"}, [performance2, performance1]
+        )
+
+    @override_settings(TIME_ZONE="Europe/Kyiv")
+    def test_filter_performances_by_date_in_time_zone(self):
+        performance1 = sample_performance(
+            show_time="2023-07-20 21:30:00+00:00"
+        )
+        sample_performance(show_time="2023-07-21 21:30:00+00:00")
+
+        self.assertListedPerformances(
+            {"date": "2023-07-21"}, [performance1]
+        )
+
+    def test_filter_performances_invalid_date(self):
+        for params in [
+            {"date": "21.07.2023"},
+            {"to": "2023-02-30"},
+            {"week": "2023-W54"},
+            {"week": "2023-29"},
+        ]:
+            res = self.client.get(PERFORMANCE_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(list(params)[0], res.data)
+
+    def test_list_performances_tickets_available(self):
+        performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=performance, reservation=reservation
+        )
+
+        res = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 399)
+
+    @override_settings(TIME_ZONE="Europe/Kyiv")
+    def test_list_performances_match_serializer(self):
+        performance = sample_performance(
+            show_time="2023-07-21 14:00:00.123456+00:00"
+        )
+        Play.objects.filter(id=performance.play_id).update(
+            image="uploads/plays/hamlet ä-1.jpg",
+            image_variants={"thumbnail": "uploads/plays/ä 1.jpg"},
+        )
+        sample_performance(show_time="2023-07-22 19:30:00+00:00")
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=performance, reservation=reservation
+        )
+
+        res = self.client.get(PERFORMANCE_URL)
+
+        serializer = PerformanceListSerializer(
+            PerformanceViewSet.queryset.order_by("-show_time", "-id"),
+            many=True,
+            context={"request": res.wsgi_request},
+        )
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertEqual(
+            res.data["results"][1]["play_image"],
+            "http://testserver/media/uploads/plays/hamlet%20%C3%A4-1.jpg",
+        )
+        self.assertEqual(
+            res.data["results"][1]["play_image_thumbnail"],
+            "http://testserver/media/uploads/plays/%C3%A4%201.jpg",
+        )
+
+    def test_retrieve_performance_taken_places(self):
+        performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=2, performance=performance, reservation=reservation
+        )
+
+        res = self.client.get(detail_url(performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken_places"], [{"row": 1, "seat": 2}])
+        self.assertNotIn("seat_map", res.data)
+
+    def test_retrieve_performance_seat_map_bitmap(self):
+        performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        for row, seat in [(1, 1), (1, 10), (20, 20)]:
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                performance=performance,
+                reservation=reservation,
+            )
+
+        res = self.client.get(
+            detail_url(performance.id), {"seatmap": "bitmap"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("taken_places", res.data)
+        self.assertEqual(res.data["seat_map"]["encoding"], "bitmap")
+        bitmap = base64.b64decode(res.data["seat_map"]["data"])
+        self.assertEqual(len(bitmap), 50)
+        self.assertEqual(bitmap[0], 0b10000000)
+        self.assertEqual(bitmap[1], 0b01000000)
+        self.assertEqual(bitmap[-1], 0b00000001)
+        self.assertEqual(sum(bin(byte).count("1") for byte in bitmap), 3)
+
+    def test_seat_map_bitmap_skips_places_outside_hall(self):
+        performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        for row, seat in [(1, 1), (1, 12), (15, 5)]:
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                performance=performance,
+                reservation=reservation,
+            )
+        # the hall was made smaller after the tickets were sold
+        TheatreHall.objects.filter(id=performance.theatre_hall_id).update(
+            rows=10, seats_in_row=10
+        )
+
+        res = self.client.get(
+            detail_url(performance.id), {"seatmap": "bitmap"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        bitmap = base64.b64decode(res.data["seat_map"]["data"])
+        self.assertEqual(len(bitmap), 13)
+        self.assertEqual(bitmap[0], 0b10000000)
+        self.assertEqual(sum(bin(byte).count("1") for byte in bitmap), 1)
 
     def test_create_performance_forbidden(self):
         play = Play.objects.create(title="Title")
@@ -10,6 +10,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 
 from theatre.models import Play, Performance, TheatreHall, Genre, Actor
+from theatre.search import python_search
 from theatre.serializers import PlayListSerializer, PlayDetailSerializer
 
 PLAY_URL = reverse("theatre:play-list")
@@ -78,7 +79,7 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer = PlayListSerializer(plays, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_plays_by_genres(self):
         genre1 = Genre.objects.create(name="Genre 1")
@@ -100,9 +101,9 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer2 = PlayListSerializer(play2)
         serializer3 = PlayListSerializer(play3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_filter_plays_by_actors(self):
         actor1 = Actor.objects.create(first_name="Actor 1", last_name="Last 1")
@@ -124,9 +125,57 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer2 = PlayListSerializer(play2)
         serializer3 = PlayListSerializer(play3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
+
+    def test_filter_plays_by_all_genres(self):
+        genre1 = Genre.objects.create(name="Genre 1")
+        genre2 = Genre.objects.create(name="Genre 2")
+
+        play1 = sample_play(title="Play 1")
+        play2 = sample_play(title="Play 2")
+
+        play1.genres.add(genre1, genre2)
+        play2.genres.add(genre2)
+
+        res = self.client.get(
+            PLAY_URL,
+            {"genres": f"{genre1.id},{genre2.id}", "genres_match": "all"},
+        )
+
+        self.assertEqual(
+            res.data["results"], [PlayListSerializer(play1).data]
+        )
+
+    def test_filter_plays_by_genres_and_actors_without_duplicates(self):
+        genre1 = Genre.objects.create(name="Genre 1")
+        genre2 = Genre.objects.create(name="Genre 2")
+        actor1 = Actor.objects.create(first_name="Actor 1", last_name="Last 1")
+        actor2 = Actor.objects.create(first_name="Actor 2", last_name="Last 2")
+
+        play = sample_play(title="Play")
+        play.genres.add(genre1, genre2)
+        play.actors.add(actor1, actor2)
+
+        res = self.client.get(
+            PLAY_URL,
+            {
+                "genres": f"{genre1.id},{genre2.id}",
+                "actors": f"{actor1.id},{actor2.id}",
+                "actors_match": "all",
+            },
+        )
+
+        self.assertEqual(res.data["results"], [PlayListSerializer(play).data])
+
+    def test_filter_plays_invalid_match(self):
+        res = self.client.get(
+            PLAY_URL, {"genres": "1", "genres_match": "some"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("genres_match", res.data)
 
     def test_filter_plays_by_title(self):
         play1 = sample_play(title="Play")
@@ -139,9 +188,9 @@ class AuthenticatedPlayApiTests(TestCase):
         serializer2 = PlayListSerializer(play2)
         serializer3 = PlayListSerializer(play3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_retrieve_play_detail(self):
         play = sample_play()
@@ -167,6 +216,84 @@ class AuthenticatedPlayApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class PlaySearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.hamlet = sample_play(
+            title="Hamlet", description="The Prince of Denmark"
+        )
+        self.macbeth = sample_play(
+            title="Macbeth", description="A Scottish general"
+        )
+        self.comedy = sample_play(
+            title="The Comedy of Errors", description="Twins"
+        )
+        self.genre = Genre.objects.create(name="Tragedy")
+        self.macbeth.genres.add(self.genre)
+        self.comedy.actors.add(
+            Actor.objects.create(first_name="Hamish", last_name="Denton")
+        )
+
+    def search(self, q):
+        res = self.client.get(PLAY_URL, {"q": q})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [play["id"] for play in res.data["results"]]
+
+    def test_search_plays_ranked_by_prefix(self):
+        self.assertEqual(self.search("ham"), [self.hamlet.id, self.comedy.id])
+        self.assertEqual(self.search("den"), [self.comedy.id, self.hamlet.id])
+        self.assertEqual(self.search("prince denmark"), [self.hamlet.id])
+        self.assertEqual(self.search("trag"), [self.macbeth.id])
+        self.assertEqual(self.search("  "), [])
+
+    def test_search_plays_cursor_pagination(self):
+        for i in range(12):
+            sample_play(
+                title=f"Play {i}",
+                description="Hamlet " * (i % 4) + "retold",
+            )
+
+        ids = []
+        url = PLAY_URL + "?q=ham&page_size=5"
+        while url:
+            res = self.client.get(url)
+            ids += [play["id"] for play in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(len(set(ids)), 11)
+        self.assertEqual(ids[:2], [self.hamlet.id, self.comedy.id])
+
+    def test_search_vector_follows_related_changes(self):
+        self.genre.name = "Drama"
+        self.genre.save()
+
+        self.assertEqual(self.search("trag"), [])
+        self.assertEqual(self.search("drama"), [self.macbeth.id])
+
+        self.genre.plays.clear()
+
+        self.assertEqual(self.search("drama"), [])
+
+    def test_python_search_fallback(self):
+        queryset = python_search(Play.objects.all(), ["ham"])
+
+        self.assertEqual(
+            list(queryset.order_by("-search_rank", "id")),
+            [self.hamlet, self.comedy],
+        )
+        self.assertFalse(
+            python_search(Play.objects.all(), ["ham", "scottish"])
+        )
+
+
 class AdminPlayApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
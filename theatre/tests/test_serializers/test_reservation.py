@@ -1,15 +1,47 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from theatre.models import Reservation, Play, TheatreHall, Performance, Ticket
-from theatre.serializers import ReservationListSerializer, ReservationSerializer
+from theatre.serializers import (
+    PerformanceListSerializer,
+    ReservationListSerializer,
+    ReservationSerializer,
+)
+from theatre.views import PerformanceViewSet
 
 RESERVATION_URL = reverse("theatre:reservation-list")
 
 
+def sample_performance(**params):
+    play = Play.objects.create(title="Title")
+    theatre_hall = TheatreHall.objects.create(
+        name="Main hall", rows=20, seats_in_row=20
+    )
+
+    defaults = {
+        "show_time": "2023-07-21 14:00:00",
+        "play": play,
+        "theatre_hall": theatre_hall,
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+def tickets_payload(performance, seats):
+    return {
+        "tickets": [
+            {"row": row, "seat": seat, "performance": performance.id}
+            for row, seat in seats
+        ]
+    }
+
+
 class UnauthenticatedReservationApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -37,3 +69,133 @@ class AuthenticatedReservationApiTests(TestCase):
 
         expected_data = ReservationListSerializer([reservation], many=True).data
         self.assertIn(expected_data[0], res.data["results"])
+
+    def test_list_reservations_side_loads_performances(self):
+        performances = [sample_performance(), sample_performance()]
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=performances[0], reservation=reservation
+        )
+        Ticket.objects.create(
+            row=1, seat=2, performance=performances[0], reservation=reservation
+        )
+
+        res = self.client.get(RESERVATION_URL)
+
+        tickets = res.data["results"][0]["tickets"]
+        self.assertEqual(
+            [ticket["performance"] for ticket in tickets],
+            [performances[0].id, performances[0].id],
+        )
+        expected = PerformanceListSerializer(
+            PerformanceViewSet.queryset.get(id=performances[0].id),
+            context={"request": res.wsgi_request},
+        ).data
+        self.assertEqual(
+            res.data["performances"], {str(performances[0].id): expected}
+        )
+        self.assertEqual(expected["tickets_available"], 398)
+
+    def test_list_reservations_query_count_is_constant(self):
+        performances = [sample_performance() for _ in range(5)]
+
+        def reserve(rows):
+            reservation = Reservation.objects.create(user=self.user)
+            Ticket.objects.bulk_create(
+                Ticket(
+                    row=row,
+                    seat=seat,
+                    performance=performance,
+                    reservation=reservation,
+                )
+                for performance in performances
+                for row in rows
+                for seat in range(1, 21)
+            )
+
+        reserve([1])
+        with CaptureQueriesContext(connection) as few_tickets:
+            self.client.get(RESERVATION_URL)
+
+        for row in range(2, 12):
+            reserve([row])
+        with CaptureQueriesContext(connection) as many_tickets:
+            res = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(len(res.data["results"]), 10)
+        self.assertEqual(len(res.data["performances"]), 5)
+        self.assertEqual(len(many_tickets), len(few_tickets))
+
+    def test_create_reservation(self):
+        performance = sample_performance()
+        payload = tickets_payload(performance, [(1, 1), (1, 2)])
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(
+            list(reservation.tickets.values_list("row", "seat")),
+            [(1, 1), (1, 2)],
+        )
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 2)
+
+    def test_create_reservation_query_count_is_constant(self):
+        performance = sample_performance()
+        query_counts = []
+
+        for row, seats_count in [(1, 1), (2, 10)]:
+            payload = tickets_payload(
+                performance,
+                [(row, seat) for seat in range(1, seats_count + 1)],
+            )
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    RESERVATION_URL, payload, format="json"
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+        self.assertEqual(Ticket.objects.count(), 11)
+
+    def test_create_reservation_seat_out_of_range(self):
+        performance = sample_performance()
+        payload = tickets_payload(performance, [(21, 1)])
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["row"][0],
+            "row number must be in available range: (1, rows): (1, 20)",
+        )
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_create_reservation_seat_taken(self):
+        performance = sample_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=performance, reservation=reservation
+        )
+        payload = tickets_payload(performance, [(1, 2), (1, 1)])
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"]["non_field_errors"][0],
+            "Ticket with this Performance, Row and Seat already exists.",
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_reservation_duplicate_seats(self):
+        performance = sample_performance()
+        payload = tickets_payload(performance, [(1, 1), (1, 1)])
+
+        res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
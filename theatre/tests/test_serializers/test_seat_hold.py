@@ -0,0 +1,213 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.holds import hold_cache
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+
+SEAT_HOLD_URL = reverse("theatre:seathold-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def sample_performance(**params):
+    play = Play.objects.create(title="Title")
+    theatre_hall = TheatreHall.objects.create(
+        name="Main hall", rows=20, seats_in_row=20
+    )
+
+    defaults = {
+        "show_time": "2023-07-21 14:00:00+00:00",
+        "play": play,
+        "theatre_hall": theatre_hall,
+    }
+    defaults.update(params)
+
+    return Performance.objects.create(**defaults)
+
+
+def detail_url(token):
+    return reverse("theatre:seathold-detail", args=[token])
+
+
+def confirm_url(token):
+    return reverse("theatre:seathold-confirm", args=[token])
+
+
+def hold_payload(performance, seats):
+    return {
+        "performance": performance.id,
+        "seats": [{"row": row, "seat": seat} for row, seat in seats],
+    }
+
+
+class UnauthenticatedSeatHoldApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.post(SEAT_HOLD_URL, {})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldApiTests(TestCase):
+    def setUp(self):
+        hold_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.other_client = APIClient()
+        self.other_client.force_authenticate(
+            get_user_model().objects.create_user(
+                "other@test.com",
+                "testpass",
+            )
+        )
+        self.performance = sample_performance()
+
+    def test_create_seat_hold(self):
+        payload = hold_payload(self.performance, [(1, 1), (1, 2)])
+
+        res = self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["performance"], self.performance.id)
+        self.assertEqual(res.data["seats"], payload["seats"])
+        self.assertIn("expires_at", res.data)
+
+        res = self.client.get(detail_url(res.data["token"]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["seats"], payload["seats"])
+
+    def test_seat_hold_kept_in_shared_cache(self):
+        payload = hold_payload(self.performance, [(1, 1)])
+
+        token = self.client.post(
+            SEAT_HOLD_URL, payload, format="json"
+        ).data["token"]
+
+        self.assertIsNotNone(hold_cache().get(f"seat-hold:{token}"))
+        self.assertIsNone(caches["default"].get(f"seat-hold:{token}"))
+
+    def test_seat_hold_not_visible_to_other_user(self):
+        payload = hold_payload(self.performance, [(1, 1)])
+        token = self.client.post(
+            SEAT_HOLD_URL, payload, format="json"
+        ).data["token"]
+
+        res = self.other_client.get(detail_url(token))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_held_seats_cannot_be_held_or_reserved_by_other_user(self):
+        payload = hold_payload(self.performance, [(1, 1), (1, 2)])
+        self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+        res = self.other_client.post(
+            SEAT_HOLD_URL,
+            hold_payload(self.performance, [(1, 3), (1, 2)]),
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.other_client.post(
+            SEAT_HOLD_URL,
+            hold_payload(self.performance, [(1, 3)]),
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.other_client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": self.performance.id}
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_hold_sold_seat(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=self.performance,
+            reservation=reservation,
+        )
+
+        res = self.client.post(
+            SEAT_HOLD_URL,
+            hold_payload(self.performance, [(1, 2), (1, 1)]),
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.other_client.post(
+            SEAT_HOLD_URL,
+            hold_payload(self.performance, [(1, 2)]),
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_hold_seat_out_of_range(self):
+        res = self.client.post(
+            SEAT_HOLD_URL,
+            hold_payload(self.performance, [(1, 21)]),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", res.data)
+
+    def test_confirm_seat_hold(self):
+        payload = hold_payload(self.performance, [(2, 1), (2, 2)])
+        token = self.client.post(
+            SEAT_HOLD_URL, payload, format="json"
+        ).data["token"]
+
+        res = self.client.post(confirm_url(token))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(
+            list(reservation.tickets.values_list("row", "seat")),
+            [(2, 1), (2, 2)],
+        )
+        self.assertEqual(
+            self.client.get(detail_url(token)).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_release_seat_hold(self):
+        payload = hold_payload(self.performance, [(1, 1)])
+        token = self.client.post(
+            SEAT_HOLD_URL, payload, format="json"
+        ).data["token"]
+
+        res = self.client.delete(detail_url(token))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = self.other_client.post(SEAT_HOLD_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(SEAT_HOLD_MINUTES=0)
+    def test_confirm_expired_seat_hold(self):
+        payload = hold_payload(self.performance, [(1, 1)])
+        token = self.client.post(
+            SEAT_HOLD_URL, payload, format="json"
+        ).data["token"]
+
+        res = self.client.post(confirm_url(token))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Reservation.objects.exists())
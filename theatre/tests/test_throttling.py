@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from theatre import metrics
+from theatre.throttling import SlidingWindowThrottle
+from theatre_api_service.caches import SweptFileBasedCache
+
+GENRE_URL = reverse("theatre:genre-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+RATES = {"anon": "2/min", "user": "5/min", "catalog": "3/min"}
+
+
+@mock.patch.object(SlidingWindowThrottle, "THROTTLE_RATES", RATES)
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        caches[settings.THROTTLE_CACHE].clear()
+        metrics.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.now = 6000.0
+        timer = mock.patch.object(
+            SlidingWindowThrottle, "timer", side_effect=lambda: self.now
+        )
+        timer.start()
+        self.addCleanup(timer.stop)
+
+    def get_statuses(self, url, count):
+        return [self.client.get(url).status_code for _ in range(count)]
+
+    def test_requests_over_rate_are_rejected(self):
+        statuses = self.get_statuses(GENRE_URL, 4)
+
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertEqual(
+            metrics.snapshot()["throttle.rejected.catalog"], 1
+        )
+
+    def test_rejection_tells_when_to_retry(self):
+        self.get_statuses(GENRE_URL, 3)
+        self.now += 30
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res["Retry-After"], "30")
+
+    def test_previous_window_is_weighted(self):
+        self.get_statuses(GENRE_URL, 3)
+
+        # two thirds of the previous window are still covered
+        self.now += 80
+        self.assertEqual(self.get_statuses(GENRE_URL, 2), [200, 429])
+
+        # the previous window has slid out completely
+        self.now += 100
+        self.assertEqual(self.get_statuses(GENRE_URL, 3), [200, 200, 200])
+
+    def test_scopes_are_counted_separately(self):
+        self.get_statuses(GENRE_URL, 3)
+
+        # reservation history falls back to the user rate
+        self.assertEqual(
+            self.get_statuses(RESERVATION_URL, 6),
+            [200, 200, 200, 200, 200, 429],
+        )
+        self.assertEqual(self.client.get(GENRE_URL).status_code, 429)
+
+    def test_scope_of_action(self):
+        throttle = SlidingWindowThrottle()
+        view = mock.Mock(
+            action="create", throttle_scopes={"create": "reservations"}
+        )
+        request = mock.Mock()
+
+        self.assertEqual(throttle.get_scope(request, view), "reservations")
+
+        view.action = "list"
+        self.assertEqual(throttle.get_scope(request, view), "user")
+
+        request.user.is_authenticated = False
+        self.assertEqual(throttle.get_scope(request, view), "anon")
+
+    def test_users_are_counted_separately(self):
+        self.get_statuses(GENRE_URL, 3)
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "pass")
+        )
+
+        self.assertEqual(self.client.get(GENRE_URL).status_code, 200)
+
+
+class SweptFileBasedCacheTests(SimpleTestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp(prefix="theatre-swept-")
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        self.cache = SweptFileBasedCache(
+            location, {"OPTIONS": {"MAX_ENTRIES": 2, "SWEEP_INTERVAL": 60}}
+        )
+        self.start = time.time() - 60
+
+    def set_at(self, seconds, key, timeout):
+        with mock.patch("time.time", return_value=self.start + seconds), \
+                mock.patch("time.monotonic", return_value=seconds):
+            self.cache.set(key, 1, timeout)
+
+    def keys(self):
+        return len(self.cache._list_cache_files())
+
+    def test_expired_entries_are_swept_every_interval(self):
+        self.set_at(0, "throttle:past", 10)
+        self.set_at(0, "seat-hold:live", 100)
+
+        self.set_at(30, "throttle:current", 60)
+        self.assertEqual(self.keys(), 3)
+
+        self.set_at(60, "throttle:next", 10)
+        self.assertEqual(self.keys(), 3)
+        self.assertIsNone(self.cache.get("throttle:past"))
+        self.assertEqual(self.cache.get("seat-hold:live"), 1)
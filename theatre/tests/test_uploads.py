@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from theatre.models import Play
+from theatre.uploads import BoundedImageUploadHandler
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="theatre-media-")
+UPLOAD_TEMP_DIR = tempfile.mkdtemp(prefix="theatre-uploads-")
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+    shutil.rmtree(UPLOAD_TEMP_DIR, ignore_errors=True)
+
+
+def image_bytes(size=(20, 20)):
+    output = BytesIO()
+    Image.new("RGB", size, "red").save(output, "PNG")
+    return output.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    FILE_UPLOAD_TEMP_DIR=UPLOAD_TEMP_DIR,
+    PLAY_IMAGE_MAX_SIZE=100_000,
+    PLAY_IMAGE_MAX_PIXELS=10_000,
+)
+class ImageUploadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+        self.play = Play.objects.create(title="Hamlet", description="")
+        self.url = reverse("theatre:play-upload-image", args=[self.play.id])
+
+    def upload(self, content, name="poster.png"):
+        return self.client.post(
+            self.url,
+            {"image": SimpleUploadedFile(name, content)},
+            format="multipart",
+        )
+
+    def test_upload_image(self):
+        res = self.upload(image_bytes())
+
+        self.assertEqual(res.status_code, 200)
+        self.play.refresh_from_db()
+        self.assertTrue(self.play.image)
+
+    def test_oversized_request_is_rejected_before_reading(self):
+        res = self.upload(b"\x89PNG\r\n\x1a\n" + os.urandom(200_000))
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            res.data["image"], ["Ensure the image has at most 100000 bytes."]
+        )
+
+    def test_oversized_file_is_rejected(self):
+        with override_settings(PLAY_IMAGE_MAX_SIZE=1_000):
+            res = self.upload(b"\x89PNG\r\n\x1a\n" + os.urandom(20_000))
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            res.data["image"], ["Ensure the image has at most 1000 bytes."]
+        )
+
+    def test_content_other_than_image_is_rejected(self):
+        res = self.upload(b"<html>" * 100, name="poster.jpg")
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["image"], ["Upload a valid image."])
+
+    def test_image_with_too_many_pixels_is_rejected(self):
+        res = self.upload(image_bytes(size=(200, 200)))
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            res.data["image"], ["Ensure the image has at most 10000 pixels."]
+        )
+        self.play.refresh_from_db()
+        self.assertFalse(self.play.image)
+
+    def test_upload_is_streamed_to_disk(self):
+        handler = BoundedImageUploadHandler()
+        handler.new_file("image", "poster.png", "image/png", None)
+        content = image_bytes()
+
+        handler.receive_data_chunk(content, 0)
+        file = handler.file_complete(len(content))
+
+        self.assertTrue(
+            file.temporary_file_path().startswith(UPLOAD_TEMP_DIR)
+        )
+        file.close()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    FILE_UPLOAD_TEMP_DIR=UPLOAD_TEMP_DIR,
+    PLAY_IMAGE_MAX_SIZE=100_000,
+)
+class ChunkedImageUploadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password"
+            )
+        )
+        self.play = Play.objects.create(title="Hamlet", description="")
+        self.url = reverse(
+            "theatre:play-upload-image-chunks", args=[self.play.id]
+        )
+        self.content = image_bytes()
+
+    def put(self, start, end, content=None, filename="poster.png"):
+        if content is None:
+            content = self.content[start:end + 1]
+        query = f"?filename={filename}" if filename is not None else ""
+        return self.client.put(
+            f"{self.url}{query}",
+            content,
+            content_type="application/octet-stream",
+            headers={
+                "Content-Range": f"bytes {start}-{end}/{len(self.content)}"
+            },
+        )
+
+    def test_upload_in_chunks(self):
+        total = len(self.content)
+
+        res = self.put(0, 29)
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(res.data, {"received": 30})
+
+        res = self.put(30, total - 1)
+        self.assertEqual(res.status_code, 200)
+
+        self.play.refresh_from_db()
+        with self.play.image.open() as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(self.client.get(self.url).data, {"received": 0})
+
+    def test_image_named_after_its_format(self):
+        for filename in (None, "poster", "poster.txt"):
+            with self.subTest(filename=filename):
+                res = self.put(0, len(self.content) - 1, filename=filename)
+
+                self.assertEqual(res.status_code, 200)
+                self.play.refresh_from_db()
+                self.assertTrue(self.play.image.name.endswith(".png"))
+
+    def test_resume_interrupted_upload(self):
+        self.put(0, 49, content=self.content[:20])
+
+        progress = self.client.get(self.url)
+        self.assertEqual(progress.data, {"received": 20})
+
+        res = self.put(50, len(self.content) - 1)
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data, {"received": 20})
+
+        res = self.put(20, len(self.content) - 1)
+        self.assertEqual(res.status_code, 200)
+
+    def test_content_other_than_image_is_rejected(self):
+        res = self.put(0, 29, content=b"<html>" * 5)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.client.get(self.url).data, {"received": 0})
+
+    def test_oversized_image_is_rejected(self):
+        res = self.client.put(
+            self.url,
+            self.content[:10],
+            content_type="application/octet-stream",
+            headers={"Content-Range": "bytes 0-9/200000"},
+        )
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_content_range_is_required(self):
+        res = self.client.put(
+            self.url, self.content, content_type="application/octet-stream"
+        )
+
+        self.assertEqual(res.status_code, 400)
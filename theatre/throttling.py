@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from theatre import metrics
+
+# throttle_scopes of viewsets whose reads are limited by the catalog rate
+CATALOG_READS = {"list": "catalog", "retrieve": "catalog"}
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Limits requests with a sliding window counter kept in the shared
+    THROTTLE_CACHE, so that all workers count against the same limit.
+
+    Requests of a fixed window are counted under a single key, and the
+    count of the previous window is weighted by the part of it the
+    sliding window still covers. That takes two counters per client
+    instead of a timestamp per request.
+
+    The scope is taken from the `throttle_scopes` of the view for its
+    action, so e.g. reservations may be limited tighter than catalog
+    reads. It falls back to "user" or "anon".
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        # the rate depends on the view, see allow_request
+        pass
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scopes", {}).get(
+            getattr(view, "action", None)
+        )
+        if scope is not None:
+            return scope
+        return "user" if request.user.is_authenticated else "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"anon:{self.get_ident(request)}"
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+        self.elapsed = self.now - window * self.duration
+
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current >= self.num_requests:
+            metrics.increment(f"throttle.rejected.{self.scope}")
+            return self.throttle_failure()
+
+        # keys outlive their window, as the next one still weighs them
+        if not self.cache.add(current_key, 1, 2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.add(current_key, 1, 2 * self.duration)
+        return True
+
+    def wait(self):
+        """Seconds until the weighted count drops below the limit"""
+        if self.current < self.num_requests:
+            if not self.previous:
+                return None
+            covered = 1 - (self.num_requests - self.current) / self.previous
+            return max(covered * self.duration - self.elapsed, 0)
+
+        # only once the current window has become the previous one
+        covered = max(1 - self.num_requests / self.current, 0)
+        return self.duration - self.elapsed + covered * self.duration
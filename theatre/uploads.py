@@ -0,0 +1,230 @@
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+from django.http.multipartparser import (
+    MultiPartParser as DjangoMultiPartParser,
+    MultiPartParserError,
+)
+from PIL import Image
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+# leading bytes of the image formats accepted for plays
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",  # JPEG
+    b"\x89PNG\r\n\x1a\n",
+    b"GIF87a",
+    b"GIF89a",
+)
+# extensions of the uploaded image files by the format Pillow reads
+IMAGE_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "GIF": ".gif",
+    "WEBP": ".webp",
+}
+# room for the multipart framing and other fields next to the file
+FORM_OVERHEAD = 64 * 2**10
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+def is_image_header(data):
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return True
+    return data.startswith(IMAGE_SIGNATURES)
+
+
+def image_size_error(file):
+    """
+    Returns why the image can't be accepted, reading only its header.
+    Decoding is left to the ImageField and variant builds, which need
+    not worry about decompression bombs then.
+    """
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except (OSError, Image.DecompressionBombError):
+        return "Upload a valid image."
+    finally:
+        file.seek(0)
+
+    if width * height > settings.PLAY_IMAGE_MAX_PIXELS:
+        return (
+            f"Ensure the image has at most "
+            f"{settings.PLAY_IMAGE_MAX_PIXELS} pixels."
+        )
+    return None
+
+
+def max_size_error():
+    return (
+        f"Ensure the image has at most "
+        f"{settings.PLAY_IMAGE_MAX_SIZE} bytes."
+    )
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded images to temporary files, so memory doesn't grow
+    with their size, and stops reading the request as soon as a file
+    turns out to be too large or not an image
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.error = None
+
+    def reject(self, error):
+        self.error = error
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, *args):
+        if content_length > settings.PLAY_IMAGE_MAX_SIZE + FORM_OVERHEAD:
+            self.reject(max_size_error())
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not is_image_header(raw_data):
+            self.reject("Upload a valid image.")
+        if start + len(raw_data) > settings.PLAY_IMAGE_MAX_SIZE:
+            self.reject(max_size_error())
+
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        error = image_size_error(file)
+        if error is not None:
+            self.reject(error)
+        return file
+
+
+class ImageUploadParser(MultiPartParser):
+    """
+    Parses multipart image uploads with BoundedImageUploadHandler,
+    raising its errors as validation errors of the file field
+    """
+
+    file_field = "image"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context["request"]
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta["CONTENT_TYPE"] = media_type
+        handler = BoundedImageUploadHandler(request)
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, [handler], encoding)
+            data, files = parser.parse()
+        except StopUpload:
+            # rejected before any part was read
+            data = files = None
+        except MultiPartParserError as exc:
+            raise ParseError(f"Multipart form parse error - {exc}")
+
+        if handler.error is not None:
+            raise ValidationError({self.file_field: [handler.error]})
+        return DataAndFiles(data, files)
+
+
+class ChunkedUploadedFile(UploadedFile):
+    """
+    A complete chunked upload, which ImageField verifies and storages
+    move from its path like files uploaded to temporary files
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def parse_content_range(header):
+    """Returns start, end and total bytes of a Content-Range header"""
+    match = CONTENT_RANGE.match(header or "")
+    if match is None:
+        raise ParseError("Content-Range of bytes is required.")
+    start, end, total = map(int, match.groups())
+    if start > end or end >= total:
+        raise ParseError("Content-Range is not valid.")
+    if total > settings.PLAY_IMAGE_MAX_SIZE:
+        raise ValidationError({"image": [max_size_error()]})
+    return start, end, total
+
+
+class ChunkedUpload:
+    """
+    An image uploaded in several requests, each appending a range of it
+    to a temporary file, so that an interrupted upload may be resumed
+    from the bytes received so far
+    """
+
+    def __init__(self, key):
+        directory = settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir()
+        self.path = os.path.join(directory, f"theatre-upload-{key}.part")
+
+    @property
+    def received(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, start, end, stream):
+        """
+        Writes the bytes from start to end read from the stream, a range
+        starting at 0 restarts the upload. Returns the bytes received.
+        """
+        with open(self.path, "r+b" if start else "wb") as file:
+            file.seek(start)
+            position = start
+            while position <= end:
+                chunk = stream.read(min(
+                    BoundedImageUploadHandler.chunk_size, end + 1 - position
+                ))
+                if not chunk:
+                    break
+                if position == 0 and not is_image_header(chunk):
+                    break
+                file.write(chunk)
+                position += len(chunk)
+            # the request may have been cut off, keep what has arrived
+            file.truncate(position)
+
+        if position == 0:
+            self.discard()
+            raise ValidationError({"image": ["Upload a valid image."]})
+        return position
+
+    def open(self, name="image"):
+        """
+        Returns the complete image as an uploaded file. Its extension
+        follows the format read from the header whatever the client
+        named it, so that a missing or wrong one doesn't reject the
+        image once all of it has been uploaded.
+        """
+        file = ChunkedUploadedFile(open(self.path, "rb"), size=self.received)
+        error = image_size_error(file)
+        if error is not None:
+            file.close()
+            self.discard()
+            raise ValidationError({"image": [error]})
+
+        with Image.open(file) as image:
+            extension = IMAGE_EXTENSIONS.get(image.format, "")
+        file.seek(0)
+        file.name = f"{os.path.splitext(name)[0]}{extension}"
+        return file
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
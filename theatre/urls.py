@@ -1,9 +1,11 @@
-from django.urls import path, include
+from django.urls import path
 from rest_framework import routers
 
 from theatre.views import (
     ActorViewSet,
-    GenreViewSet, TheatreHallViewSet, PlayViewSet, PerformanceViewSet, ReservationViewSet
+    GenreViewSet, TheatreHallViewSet, PlayViewSet, PerformanceViewSet, ReservationViewSet,
+    SeatHoldViewSet,
+    MetricsView,
 )
 
 router = routers.DefaultRouter()
@@ -13,8 +15,11 @@ router.register("theatre_halls", TheatreHallViewSet)
 router.register("plays", PlayViewSet)
 router.register("performances", PerformanceViewSet)
 router.register("reservations", ReservationViewSet)
+router.register("holds", SeatHoldViewSet, basename="seathold")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+]
 
 app_name = "theatre"
@@ -1,23 +1,45 @@
-from datetime import datetime
+from io import BytesIO
 
-from django.db.models import F, Count
+from asgiref.sync import sync_to_async
+from django.db.models import F
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from theatre import metrics
+from theatre.async_views import AsyncReadMixin
+from theatre.cache import (
+    CatalogCacheMixin,
+    ConditionalGetMixin,
+    version_key,
+)
+from theatre.filters import parse_match, related_filter, show_time_filters
+from theatre.search import search_plays
+from theatre.throttling import CATALOG_READS
+from theatre.uploads import (
+    ChunkedUpload,
+    ImageUploadParser,
+    parse_content_range,
+)
+from user.authentication import TokenUserAuthentication
+
 from theatre.models import (
     Genre,
     Actor,
     Performance,
     Play,
     TheatreHall,
-    Reservation
+    Reservation,
+    Ticket,
 )
+from theatre.holds import get_hold, release_hold
 from theatre.permissions import IsAdminOrIfAuthenticatedReadOnly
 from theatre.serializers import (
     GenreSerializer,
@@ -31,38 +53,139 @@ from theatre.serializers import (
     ReservationListSerializer,
     PerformanceListSerializer,
     PerformanceDetailSerializer,
+    PerformanceListRows,
+    PerformanceSeatMapSerializer,
     PlayImageSerializer,
+    SeatHoldSerializer,
+    UploadProgressSerializer,
 )
 
 
+class ValuesListMixin:
+    """
+    Lists `.values()` rows rendered by `list_rows_class` instead of
+    serializing model instances
+    """
+
+    list_rows_class = None
+
+    def get_rows(self, queryset):
+        return queryset.values(*self.list_rows_class.columns)
+
+    def rows_response(self, rows, paginated):
+        data = self.list_rows_class(
+            rows, context=self.get_serializer_context()
+        ).data
+        if paginated:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.rows_response(page, paginated=True)
+        return self.rows_response(rows, paginated=False)
+
+    async def alist(self, request, *args, **kwargs):
+        rows = self.get_rows(await self.afilter_queryset())
+
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.rows_response(page, paginated=True)
+        return self.rows_response(
+            [row async for row in rows], paginated=False
+        )
+
+
+class PlayPagination(CursorPagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    ordering = ("title", "id")
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations:
+            return "-search_rank", "id"
+
+        return super().get_ordering(request, queryset, view)
+
+
+class PerformancePagination(CursorPagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    ordering = ("-show_time", "-id")
+
+
+class ReservationPagination(CursorPagination):
+    page_size = 10
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["performances"] = {
+            "type": "object",
+            "description": (
+                "Performances of the tickets on the page keyed by id"
+            ),
+            "additionalProperties": {"type": "object"},
+        }
+        return response_schema
+
+
 class GenreViewSet(
+    ConditionalGetMixin,
+    CatalogCacheMixin,
     viewsets.ModelViewSet
 ):
+    cache_models = (Genre, )
+    throttle_scopes = CATALOG_READS
+    authentication_classes = (TokenUserAuthentication, )
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
     
 
 class ActorViewSet(
+    ConditionalGetMixin,
+    CatalogCacheMixin,
     viewsets.ModelViewSet
 ):
+    cache_models = (Actor, )
+    throttle_scopes = CATALOG_READS
+    authentication_classes = (TokenUserAuthentication, )
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
 
 class TheatreHallViewSet(
+    ConditionalGetMixin,
+    CatalogCacheMixin,
     viewsets.ModelViewSet
 ):
+    cache_models = (TheatreHall, )
+    throttle_scopes = CATALOG_READS
+    authentication_classes = (TokenUserAuthentication, )
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
     
 
 class PlayViewSet(
+    ConditionalGetMixin,
+    CatalogCacheMixin,
+    AsyncReadMixin,
     viewsets.ModelViewSet
 ):
+    cache_models = (Play, Genre, Actor)
+    throttle_scopes = CATALOG_READS
+    authentication_classes = (TokenUserAuthentication, )
     queryset = Play.objects.prefetch_related("genres", "actors")
     serializer_class = PlaySerializer
+    pagination_class = PlayPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
     @staticmethod
@@ -72,24 +195,48 @@ class PlayViewSet(
 
     def get_queryset(self):
         """Retrieve the plays with filters"""
+        q = self.request.query_params.get("q")
         title = self.request.query_params.get("title")
         genres = self.request.query_params.get("genres")
         actors = self.request.query_params.get("actors")
+        genres_match = self.request.query_params.get("genres_match")
+        actors_match = self.request.query_params.get("actors_match")
 
-        queryset = self.queryset
+        queryset = super().get_queryset()
+
+        if q is not None:
+            queryset = search_plays(queryset, q)
 
         if title is not None:
             queryset = queryset.filter(title__icontains=title)
 
         if genres is not None:
             genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
+            queryset = queryset.filter(related_filter(
+                Play,
+                "genres",
+                genres_ids,
+                parse_match("genres_match", genres_match),
+            ))
 
         if actors is not None:
             actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__id__in=actors_ids)
+            queryset = queryset.filter(related_filter(
+                Play,
+                "actors",
+                actors_ids,
+                parse_match("actors_match", actors_match),
+            ))
+
+        return queryset
 
-        return queryset.distinct()
+    async def afilter_queryset(self):
+        if "q" not in self.request.query_params:
+            return await super().afilter_queryset()
+        # databases without full-text search are queried for the ranks
+        return await sync_to_async(
+            lambda: self.filter_queryset(self.get_queryset())
+        )()
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -98,16 +245,62 @@ class PlayViewSet(
         if self.action == "retrieve":
             return PlayDetailSerializer
 
-        if self.action == "upload_image":
+        if self.action in ("upload_image", "upload_image_chunks"):
             return PlayImageSerializer
 
         return PlaySerializer
 
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            "q",
+            type=OpenApiTypes.STR,
+            description=(
+                    "Search plays by title, description, genres and actors, "
+                    "matching words by prefix, best first (ex. ?q=shakesp)"
+            )
+        ),
+        OpenApiParameter(
+            "genres",
+            type=OpenApiTypes.STR,
+            description=(
+                    "Filter by comma separated genre ids (ex. ?genres=1,2)"
+            )
+        ),
+        OpenApiParameter(
+            "genres_match",
+            type=OpenApiTypes.STR,
+            enum=["any", "all"],
+            description=(
+                    "Keep plays having any (default) or all of the genres "
+                    "(ex. ?genres=1,2&genres_match=all)"
+            )
+        ),
+        OpenApiParameter(
+            "actors",
+            type=OpenApiTypes.STR,
+            description=(
+                    "Filter by comma separated actor ids (ex. ?actors=1,2)"
+            )
+        ),
+        OpenApiParameter(
+            "actors_match",
+            type=OpenApiTypes.STR,
+            enum=["any", "all"],
+            description=(
+                    "Keep plays having any (default) or all of the actors "
+                    "(ex. ?actors=1,2&actors_match=all)"
+            )
+        ),
+    ])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(
         methods=["POST"],
         detail=True,
         url_path="upload-image",
         permission_classes=[IsAdminUser],
+        parser_classes=[ImageUploadParser],
     )
     def upload_image(self, request, pk=None):
         """Endpoint for uploading image to specific play"""
@@ -118,30 +311,118 @@ class PlayViewSet(
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        methods=["PUT"],
+        request={"application/octet-stream": OpenApiTypes.BINARY},
+        parameters=[
+            OpenApiParameter(
+                "Content-Range",
+                location=OpenApiParameter.HEADER,
+                required=True,
+                description=(
+                    "Range of the image in the body, starting at the "
+                    "bytes received so far (ex. bytes 0-1048575/5000000)"
+                ),
+            ),
+            OpenApiParameter(
+                "filename",
+                description=(
+                    "Name of the image file, its extension follows the "
+                    "format of the image (ex. ?filename=a.jpg)"
+                ),
+            ),
+        ],
+        responses={
+            200: PlayImageSerializer,
+            202: UploadProgressSerializer,
+            409: UploadProgressSerializer,
+        },
+    )
+    @extend_schema(methods=["GET"], responses=UploadProgressSerializer)
+    @action(
+        methods=["GET", "PUT"],
+        detail=True,
+        url_path="upload-image/chunks",
+        permission_classes=[IsAdminUser],
+    )
+    def upload_image_chunks(self, request, pk=None):
+        """
+        Endpoint for uploading image to specific play in parts, so that
+        an interrupted upload can resume from the bytes received
+        """
+        play = self.get_object()
+        upload = ChunkedUpload(f"{play.id}-{request.user.id}")
+        if request.method == "GET":
+            return Response({"received": upload.received})
+
+        start, end, total = parse_content_range(
+            request.headers.get("Content-Range")
+        )
+        if start not in (0, upload.received):
+            return Response(
+                {"received": upload.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        received = upload.append(start, end, request.stream or BytesIO())
+        if received < total:
+            return Response(
+                {"received": received}, status=status.HTTP_202_ACCEPTED
+            )
 
-class PerformanceViewSet(viewsets.ModelViewSet):
+        image = upload.open(request.query_params.get("filename", "image"))
+        try:
+            # the name can't fail validation, what does is the image
+            # itself, which only uploading another one fixes
+            serializer = self.get_serializer(play, data={"image": image})
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        finally:
+            image.close()
+            upload.discard()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PerformanceViewSet(
+    ConditionalGetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet
+):
+    cache_models = (Performance, Play, TheatreHall, Ticket)
+    throttle_scopes = CATALOG_READS
+    authentication_classes = (TokenUserAuthentication, )
+    list_rows_class = PerformanceListRows
     queryset = (
         Performance.objects.all()
         .select_related("play", "theatre_hall")
         .annotate(
             tickets_available=(
                 F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
-                - Count("tickets")
+                - F("tickets_sold")
             )
         )
     )
     serializer_class = PerformanceSerializer
+    pagination_class = PerformancePagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
+    def get_version_keys(self):
+        if self.action == "retrieve":
+            pk = self.kwargs["pk"]
+            return [
+                version_key(model)
+                for model in (Performance, Play, Genre, Actor, TheatreHall)
+            ] + [version_key(Ticket, int(pk) if pk.isdigit() else pk)]
+
+        return super().get_version_keys()
+
     def get_queryset(self):
-        date = self.request.query_params.get("date")
         play_id_str = self.request.query_params.get("play")
 
-        queryset = self.queryset
-
-        if date is not None:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+        queryset = super().get_queryset().filter(
+            **show_time_filters(self.request.query_params)
+        )
 
         if play_id_str is not None:
             queryset = queryset.filter(play_id=int(play_id_str))
@@ -153,6 +434,9 @@ class PerformanceViewSet(viewsets.ModelViewSet):
             return PerformanceListSerializer
 
         if self.action == "retrieve":
+            if self.request.query_params.get("seatmap") == "bitmap":
+                return PerformanceSeatMapSerializer
+
             return PerformanceDetailSerializer
 
         return PerformanceSerializer
@@ -166,6 +450,30 @@ class PerformanceViewSet(viewsets.ModelViewSet):
                     "(ex. ?date=2023-07-20)"
             )
         ),
+        OpenApiParameter(
+            "from",
+            type=OpenApiTypes.DATE,
+            description=(
+                    "Filter by performances starting on the date or later "
+                    "(ex. ?from=2023-07-20)"
+            )
+        ),
+        OpenApiParameter(
+            "to",
+            type=OpenApiTypes.DATE,
+            description=(
+                    "Filter by performances starting on the date or earlier "
+                    "(ex. ?to=2023-07-27)"
+            )
+        ),
+        OpenApiParameter(
+            "week",
+            type=OpenApiTypes.STR,
+            description=(
+                    "Filter by ISO week of Performance "
+                    "(ex. ?week=2023-W29)"
+            )
+        ),
         OpenApiParameter(
             "play",
             type=OpenApiTypes.INT,
@@ -175,22 +483,29 @@ class PerformanceViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
-
-class ReservationPagination(PageNumberPagination):
-    page_size = 10
-    max_page_size = 100
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            "seatmap",
+            type=OpenApiTypes.STR,
+            enum=["bitmap"],
+            description=(
+                    "Return taken places as a base64 encoded row-major "
+                    "bitmap instead of a list (ex. ?seatmap=bitmap)"
+            )
+        ),
+    ])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class ReservationViewSet(
     viewsets.ModelViewSet
 ):
-    queryset = Reservation.objects.prefetch_related(
-        "tickets__performance__play",
-        "tickets__performance__theatre_hall"
-    )
+    queryset = Reservation.objects.prefetch_related("tickets")
     serializer_class = ReservationSerializer
     pagination_class = ReservationPagination
     permission_classes = (IsAuthenticated, )
+    throttle_scopes = {"create": "reservations"}
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
@@ -203,3 +518,90 @@ class ReservationViewSet(
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def get_performances(self, reservations):
+        """Renders each performance of the tickets once, keyed by id"""
+        performance_ids = {
+            ticket.performance_id
+            for reservation in reservations
+            for ticket in reservation.tickets.all()
+        }
+        rows = PerformanceViewSet.queryset.filter(
+            id__in=performance_ids
+        ).values(*PerformanceListRows.columns)
+
+        return {
+            str(performance["id"]): performance
+            for performance in PerformanceListRows(
+                rows, context=self.get_serializer_context()
+            ).data
+        }
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        serializer = self.get_serializer(page, many=True)
+
+        response = self.get_paginated_response(serializer.data)
+        response.data["performances"] = self.get_performances(page)
+        return response
+
+
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    GenericViewSet,
+):
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated, )
+    throttle_scopes = {"create": "reservations", "confirm": "reservations"}
+    lookup_field = "token"
+    lookup_value_regex = "[0-9a-f]{32}"
+
+    def get_object(self):
+        hold = get_hold(self.kwargs["token"])
+        if hold is None or hold.user_id != self.request.user.id:
+            raise NotFound("Seat hold not found or expired.")
+        return hold
+
+    def retrieve(self, request, token=None):
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    def destroy(self, request, token=None):
+        release_hold(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(request=None, responses=ReservationSerializer)
+    @action(methods=["POST"], detail=True)
+    def confirm(self, request, token=None):
+        """Endpoint for turning the seat hold into a reservation"""
+        hold = self.get_object()
+        serializer = ReservationSerializer(
+            data={
+                "tickets": [
+                    {
+                        "row": row,
+                        "seat": seat,
+                        "performance": hold.performance_id,
+                    }
+                    for row, seat in hold.seats
+                ]
+            },
+            context=self.get_serializer_context(),
+        )
+
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        release_hold(hold)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class MetricsView(APIView):
+    """Counters of the current process, e.g. catalog cache hits/misses"""
+
+    permission_classes = (IsAdminUser, )
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response(metrics.snapshot())
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theatre_api_service.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'true')
+# each request runs its sync code in a thread of its own, whose
+# persistent connection no later request would reuse
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
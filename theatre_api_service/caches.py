@@ -0,0 +1,40 @@
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class SweptFileBasedCache(FileBasedCache):
+    """
+    File based cache that never culls entries to make room, and removes
+    the expired ones every SWEEP_INTERVAL seconds instead.
+
+    FileBasedCache lists its whole directory before every write to
+    count entries, and only deletes an expired entry when its key is
+    read again. Keys of request counts of windows gone by, or of
+    abandoned seat holds, never are, so writes would keep slowing down
+    as their files pile up.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        options = params.get("OPTIONS", {})
+        self._sweep_interval = options.get("SWEEP_INTERVAL", 60)
+        self._next_sweep = 0
+
+    def _cull(self):
+        # run before every write
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._sweep_interval
+        self.clear_expired()
+
+    def clear_expired(self):
+        """Deletes the files of expired entries"""
+        for path in self._list_cache_files():
+            try:
+                with open(path, "rb") as file:
+                    self._is_expired(file)
+            except FileNotFoundError:
+                # removed by another process meanwhile
+                pass
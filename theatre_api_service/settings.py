@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -26,9 +27,24 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "true").lower() == "true"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv("ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+CSRF_TRUSTED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+    if origin.strip()
+]
+
+if not DEBUG:
+    # Requests come through the nginx proxy of the production profile
+    USE_X_FORWARDED_HOST = True
+    SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
 
 # Application definition
@@ -40,9 +56,11 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    "django.contrib.postgres",
     "theatre",
     "rest_framework",
     "user",
+    "tasks",
     "drf_spectacular",
 ]
 
@@ -77,21 +95,99 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'theatre_api_service.wsgi.application'
 
+# Serve the catalog reads as coroutine views, on by default in the ASGI
+# app only, as under WSGI they would just run in an event loop thread
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds (0 closes them
+# after each request) and checked before reuse. Set DB_POOLER when
+# connecting through a transaction pooler such as PgBouncer, which
+# can't keep the server-side cursors of iterator() across transactions.
+DB_POOLER = os.getenv("DB_POOLER", "false").lower() == "true"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
         "HOST": os.getenv("POSTGRES_HOST"),
+        "PORT": os.getenv("POSTGRES_PORT", ""),
         "NAME": os.getenv("POSTGRES_NAME"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": (
+            os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
+        "DISABLE_SERVER_SIDE_CURSORS": DB_POOLER,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+THROTTLE_CACHE_BACKEND = os.getenv(
+    "THROTTLE_CACHE_BACKEND",
+    "theatre_api_service.caches.SweptFileBasedCache",
+)
+STATE_CACHE_BACKEND = os.getenv(
+    "STATE_CACHE_BACKEND",
+    "theatre_api_service.caches.SweptFileBasedCache",
+)
+
+
+CACHES = {
+    # Catalog responses and their versions, and users authenticated by
+    # JWT. It has to be shared by all workers in production, such as
+    # RedisCache, the process local default only suits a single one.
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+    # Shared by all workers, e.g. RedisCache in production, which counts
+    # atomically. The file based default stands in for it on a single
+    # machine and in tests, losing a count now and then as it reads and
+    # writes counters separately. It sweeps out the counts of past
+    # windows, which are never read again.
+    "throttle": {
+        "BACKEND": THROTTLE_CACHE_BACKEND,
+        "LOCATION": os.getenv(
+            "THROTTLE_CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "theatre-api-throttle"),
+        ),
+    },
+    # Seat holds and token revocations, which must be seen by all
+    # workers and never be culled to make room. Redis in production, as
+    # the file based default isn't atomic and can let two workers hold
+    # the same seat. It sweeps out abandoned holds once expired.
+    "state": {
+        "BACKEND": STATE_CACHE_BACKEND,
+        "LOCATION": os.getenv(
+            "STATE_CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "theatre-api-state"),
+        ),
+    },
+}
+
+CATALOG_CACHE = "default"
+CATALOG_CACHE_TIMEOUT = 300
+
+THROTTLE_CACHE = "throttle"
+
+HOLD_CACHE = "state"
+
+USER_CACHE = "default"
+
+# a culled or lost revocation would let revoked tokens through again
+REVOCATION_CACHE = "state"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -127,10 +223,59 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
+# Served by Django only with DEBUG on, otherwise by nginx from the
+# directories collectstatic and uploads write to
 STATIC_URL = 'static/'
+STATIC_ROOT = os.getenv("STATIC_ROOT", "/vol/web/static")
 
 MEDIA_URL = "/media/"
-MEDIA_ROOT = "/vol/web/media"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "/vol/web/media")
+
+# Set to X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd) to
+# leave sending media files to the front proxy
+MEDIA_OFFLOAD_HEADER = os.getenv("MEDIA_OFFLOAD_HEADER", "")
+# internal location of the proxy X-Accel-Redirect points into
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+
+STORAGES = {
+    "default": {
+        "BACKEND": "theatre.storage.HashedFileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Limits of play images, their pixels are checked before decoding them
+PLAY_IMAGE_MAX_SIZE = int(os.getenv("PLAY_IMAGE_MAX_SIZE", 10 * 2**20))
+PLAY_IMAGE_MAX_PIXELS = int(os.getenv("PLAY_IMAGE_MAX_PIXELS", 50_000_000))
+
+# Workers of `manage.py run_tasks` and how failed tasks are retried,
+# waiting TASKS_RETRY_BACKOFF seconds, doubled after every attempt
+TASKS_WORKER_CONCURRENCY = int(os.getenv("TASKS_WORKER_CONCURRENCY", 2))
+TASKS_POLL_INTERVAL = float(os.getenv("TASKS_POLL_INTERVAL", 1))
+TASKS_MAX_ATTEMPTS = int(os.getenv("TASKS_MAX_ATTEMPTS", 5))
+TASKS_RETRY_BACKOFF = int(os.getenv("TASKS_RETRY_BACKOFF", 10))
+TASKS_RETRY_BACKOFF_MAX = int(os.getenv("TASKS_RETRY_BACKOFF_MAX", 3600))
+# seconds a claimed task is left to its worker before others retry it
+TASKS_LEASE = int(os.getenv("TASKS_LEASE", 900))
+
+# Reservation confirmations are sent by `manage.py send_confirmations`,
+# the console backend only prints them
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 25))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "false").lower() == "true"
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+# retried after TASKS_RETRY_BACKOFF seconds, doubled after every attempt,
+# so that the default outlasts a mail server down for three hours
+CONFIRMATION_MAX_ATTEMPTS = int(os.getenv("CONFIRMATION_MAX_ATTEMPTS", 12))
+# seconds a dispatcher has to send the batch it claimed
+CONFIRMATION_LEASE = int(os.getenv("CONFIRMATION_LEASE", 300))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -139,16 +284,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "theatre.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'theatre.throttling.SlidingWindowThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        'catalog': '10000/day',
+        'reservations': '30/hour',
     },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 }
 
@@ -170,4 +325,14 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.ClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.RevocableTokenRefreshSerializer"
+    ),
 }
+
+SEAT_HOLD_MINUTES = 10
+
+TEST_RUNNER = "theatre_api_service.test_runner.TestRunner"
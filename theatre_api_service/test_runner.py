@@ -0,0 +1,44 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Keeps the throttle counters, seat holds and token revocations of
+    every test run in fresh directories, so runs don't inherit the
+    limits used up, seats held or users revoked by earlier ones
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_locations = {
+            alias: tempfile.mkdtemp(prefix=f"theatre-{alias}-")
+            for alias in {
+                settings.THROTTLE_CACHE,
+                settings.HOLD_CACHE,
+                settings.REVOCATION_CACHE,
+            }
+        }
+        self.shared_caches = override_settings(CACHES={
+            **settings.CACHES,
+            **{
+                alias: {
+                    "BACKEND": (
+                        "theatre_api_service.caches.SweptFileBasedCache"
+                    ),
+                    "LOCATION": location,
+                }
+                for alias, location in self.cache_locations.items()
+            },
+        })
+        self.shared_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.shared_caches.disable()
+        for location in self.cache_locations.values():
+            shutil.rmtree(location, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
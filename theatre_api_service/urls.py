@@ -14,16 +14,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import (
     SpectacularSwaggerView,
     SpectacularAPIView,
     SpectacularRedocView
 )
 
+from theatre.media import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/theatre/", include("theatre.urls", namespace="theatre")),
@@ -39,4 +42,9 @@ urlpatterns = [
       SpectacularRedocView.as_view(url_name="schema"),
       name="redoc",
     ),
- ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(
+      r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+      serve_media,
+      name="media",
+    ),
+ ]
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCAL_CACHE_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Cached users and revocations have to be seen by every worker, a
+    process local cache would keep them in the one that wrote them
+    """
+    warnings = []
+    for setting in ("USER_CACHE", "REVOCATION_CACHE"):
+        alias = getattr(settings, setting)
+        if settings.CACHES[alias]["BACKEND"] == LOCAL_CACHE_BACKEND:
+            warnings.append(Warning(
+                f"{setting} uses a process local cache.",
+                hint=(
+                    f"Point CACHES['{alias}'] at a cache shared by all "
+                    "workers, such as RedisCache."
+                ),
+                id="user.W001",
+            ))
+    return warnings
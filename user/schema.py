@@ -0,0 +1,27 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTScheme,
+    TokenObtainPairSerializerExtension,
+    TokenRefreshSerializerExtension,
+)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documents the authentication classes as the same bearer scheme"""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
+
+
+class TokenUserScheme(SimpleJWTScheme):
+    target_class = "user.authentication.TokenUserAuthentication"
+
+
+class ClaimsTokenObtainPairSerializerExtension(
+    TokenObtainPairSerializerExtension
+):
+    target_class = "user.serializers.ClaimsTokenObtainPairSerializer"
+
+
+class RevocableTokenRefreshSerializerExtension(
+    TokenRefreshSerializerExtension
+):
+    target_class = "user.serializers.RevocableTokenRefreshSerializer"
@@ -1,5 +1,12 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+
+from user.authentication import TOKEN_CLAIMS, is_revoked
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -22,3 +29,26 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        """Copy flags permissions are checked with into the token"""
+        token = super().get_token(user)
+        for claim in TOKEN_CLAIMS:
+            token[claim] = getattr(user, claim)
+
+        return token
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        """Refuse refresh tokens with claims revoked since"""
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh):
+            raise InvalidToken(
+                "Token has been revoked", code="token_revoked"
+            )
+
+        return super().validate(attrs)
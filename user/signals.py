@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from user.authentication import (
+    TOKEN_CLAIMS,
+    invalidate_user,
+    revoke_tokens,
+)
+from user.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+    # a request in between may have cached the row not yet committed
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(pre_save, sender=User)
+def remember_token_claims(sender, instance, **kwargs):
+    if instance._state.adding:
+        return
+    instance.saved_token_claims = (
+        sender.objects.filter(pk=instance.pk)
+        .values(*TOKEN_CLAIMS, "is_active")
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_outdated_tokens(sender, instance, **kwargs):
+    saved = getattr(instance, "saved_token_claims", None)
+    if saved is None:
+        return
+    if any(getattr(instance, field) != saved[field] for field in saved):
+        revoke_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_of_deleted_user(sender, instance, **kwargs):
+    revoke_tokens(instance.pk)
@@ -1,3 +1,226 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user.authentication import (
+    CachedJWTAuthentication,
+    revocation_cache,
+    revocation_key,
+    user_cache,
+    user_cache_key,
+)
+from user.checks import check_shared_caches
+
+MANAGE_USER_URL = reverse("user:manage")
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+GENRE_URL = reverse("theatre:genre-list")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.token = AccessToken.for_user(self.user)
+
+    def authenticate(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_authenticated)
+        self.assertFalse(user.is_staff)
+
+    def test_saving_user_invalidates_cache(self):
+        self.authenticate()
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertTrue(self.authenticate().is_staff)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_user_is_rejected(self):
+        self.authenticate()
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_user_cached_before_commit_is_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+            # cached by another worker, which still read the old row
+            user_cache().set(
+                user_cache_key(self.user.id),
+                {"id": self.user.id, "is_staff": False, "is_active": True},
+            )
+
+        self.assertTrue(self.authenticate().is_staff)
+
+    def test_process_local_user_cache_is_reported(self):
+        for backend, ids in (
+            ("django.core.cache.backends.locmem.LocMemCache", ["user.W001"]),
+            ("django.core.cache.backends.redis.RedisCache", []),
+        ):
+            with self.subTest(backend), override_settings(CACHES={
+                **settings.CACHES,
+                settings.USER_CACHE: {"BACKEND": backend},
+            }):
+                warnings = check_shared_caches(None)
+
+                self.assertEqual([warning.id for warning in warnings], ids)
+
+
+class ManageUserViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_retrieve_with_cached_user(self):
+        self.client.get(MANAGE_USER_URL)
+
+        res = self.client.get(MANAGE_USER_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["email"], "test@test.com")
+
+    def test_update_keeps_other_fields(self):
+        self.client.get(MANAGE_USER_URL)
+
+        res = self.client.patch(MANAGE_USER_URL, {"password": "newpass"})
+
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "test@test.com")
+        self.assertTrue(self.user.check_password("newpass"))
+
+
+class TokenClaimsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client = APIClient()
+
+    def obtain_token(self, email="test@test.com"):
+        res = self.client.post(
+            TOKEN_URL, {"email": email, "password": "testpass"}
+        )
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def authorize(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_token_carries_claims(self):
+        get_user_model().objects.create_user(
+            "staff@test.com", "testpass", is_staff=True
+        )
+
+        access = AccessToken(self.obtain_token("staff@test.com")["access"])
+
+        self.assertTrue(access["is_staff"])
+        self.assertFalse(access["is_superuser"])
+
+    def test_catalog_reads_skip_user_table(self):
+        self.authorize(self.obtain_token()["access"])
+        self.client.get(GENRE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_staff_claim_grants_catalog_writes(self):
+        get_user_model().objects.create_user(
+            "staff@test.com", "testpass", is_staff=True
+        )
+        self.authorize(self.obtain_token("staff@test.com")["access"])
+
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, 201)
+
+    def test_changed_claims_revoke_tokens(self):
+        tokens = self.obtain_token()
+        self.user.is_staff = True
+        self.user.save()
+
+        self.authorize(tokens["access"])
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+        self.assertEqual(res.status_code, 401)
+
+        res = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(res.status_code, 401)
+
+    def test_unchanged_claims_keep_tokens(self):
+        self.authorize(self.obtain_token()["access"])
+        self.user.first_name = "Test"
+        self.user.save()
+
+        self.assertEqual(self.client.get(GENRE_URL).status_code, 200)
+
+    def test_tokens_issued_after_revocation_are_accepted(self):
+        with mock.patch(
+            "user.authentication.time.time", return_value=time.time() - 5
+        ):
+            self.user.is_staff = True
+            self.user.save()
+        refresh = RefreshToken.for_user(self.user)
+
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": str(refresh)})
+        self.assertEqual(res.status_code, 200)
+
+        self.authorize(res.data["access"])
+        self.assertEqual(self.client.get(GENRE_URL).status_code, 200)
+
+    def test_revocations_kept_in_shared_cache(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        key = revocation_key(self.user.id)
+        self.assertIsNotNone(revocation_cache().get(key))
+        self.assertIsNone(caches["default"].get(key))
+
+    def test_deleted_user_tokens_are_revoked(self):
+        self.authorize(self.obtain_token()["access"])
+        self.user.delete()
+
+        self.assertEqual(self.client.get(GENRE_URL).status_code, 401)